@@ -4,13 +4,17 @@ Flask-based API for the Situation Awareness Layer demo
 Serves real-time data to the dashboard
 """
 
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import atexit
 import sys
 from pathlib import Path
 import time
 import threading
-import json
+from queue import Queue, Full
+
+import orjson
 
 # Add backend to path
 sys.path.append(str(Path(__file__).parent))
@@ -18,46 +22,123 @@ sys.path.append(str(Path(__file__).parent))
 from situation_awareness_layer import SituationAwarenessLayer
 from demo_simulator import MaritimeDataSimulator
 
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson for fast serialization with native datetime support"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__, static_folder='../dashboard')
-CORS(app)  # Enable CORS for frontend
+app.json = OrjsonProvider(app)
+# Scope CORS to the API routes and let browsers cache preflights for a
+# day instead of paying an OPTIONS round-trip per fetch
+CORS(
+    app,
+    resources={r"/api/*": {"origins": [
+        "http://localhost:5000", "http://localhost:3000"
+    ]}},
+    max_age=86400,
+    send_wildcard=False,
+)
 
 # Initialize SA Layer and Simulator
 sa_layer = SituationAwarenessLayer()
 simulator = MaritimeDataSimulator()
 
-# Store latest output
+# Store latest output and its pre-serialized JSON payload.
+# Published by plain assignment: rebinding a module global is atomic
+# under the GIL, so readers never need a lock for a single snapshot.
 latest_output = None
-output_lock = threading.Lock()
+latest_payload = None
+
+# SSE subscribers: one Queue per connected dashboard. The producer pushes
+# the shared payload bytes once per tick, so serialization cost stays
+# O(1) regardless of client count.
+_sse_clients = []
+_sse_lock = threading.Lock()
+
+# Cache-aside for /api/vessel: (version, payload bytes, etag), versioned
+# by simulator.update_count so repeat polls within a tick cost nothing
+_vessel_cache = (None, b'', '')
+
+
+# Set to request a clean stop; the processing thread wakes from its
+# deadline wait immediately instead of finishing a blind sleep
+stop_event = threading.Event()
+atexit.register(stop_event.set)
 
 
 def background_processing():
     """Background thread for continuous processing"""
-    global latest_output
-    
-    while True:
+    global latest_output, latest_payload
+
+    # Monotonic deadline scheduling keeps a steady 1 Hz cadence
+    # (sleep-after-work would drift by the per-tick processing time)
+    next_t = time.monotonic()
+
+    while not stop_event.is_set():
         try:
             # Generate sensor data
             sensor_data = simulator.generate_sensor_data()
-            
+
             # Process through SA layer
             output = sa_layer.process_sensor_data(sensor_data)
-            
-            # Store output
-            with output_lock:
-                latest_output = output
-            
-            # Sleep for update interval
-            time.sleep(1.0)  # 1 Hz updates
-            
+
+            # Serialize once per tick so request handlers just hand
+            # back the cached bytes
+            payload = orjson.dumps(
+                output.to_dict(),
+                option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+            )
+
+            # Publish (atomic rebinds; immutable bytes payload)
+            latest_output = output
+            latest_payload = payload
+
+            # Fan out to SSE subscribers; drop the tick for any client
+            # whose queue is full rather than blocking the producer
+            for q in tuple(_sse_clients):
+                try:
+                    q.put_nowait(payload)
+                except Full:
+                    pass
+
         except Exception as e:
             print(f"Error in background processing: {e}")
-            time.sleep(1.0)
+
+        # Wait until the next 1 Hz deadline; returns True (and we stop)
+        # as soon as stop_event is set
+        next_t += 1.0
+        delay = next_t - time.monotonic()
+        if delay > 0:
+            if stop_event.wait(delay):
+                return
+        else:
+            # Fell behind; resynchronize instead of bursting to catch up
+            next_t = time.monotonic()
 
 
-# Start background thread
-processing_thread = threading.Thread(target=background_processing, daemon=True)
-processing_thread.start()
+# Background thread handle; started once via start_background_processing()
+processing_thread = None
+
+
+def start_background_processing():
+    """Start the 1 Hz processing thread (idempotent)"""
+    global processing_thread
+    if processing_thread is None or not processing_thread.is_alive():
+        processing_thread = threading.Thread(
+            target=background_processing, daemon=True
+        )
+        processing_thread.start()
 
 
 @app.route('/')
@@ -69,20 +150,65 @@ def index():
 @app.route('/api/status')
 def get_status():
     """Get current SA layer output"""
-    with output_lock:
-        if latest_output is None:
-            return jsonify({'status': 'initializing'})
-        
+    payload = latest_payload
+    if payload is None:
+        return jsonify({'status': 'initializing'})
+
+    return Response(
+        payload, mimetype='application/json',
+        headers={'Cache-Control': 'no-store'}
+    )
+
+
+@app.route('/api/stream')
+def stream_status():
+    """Stream SA layer output via Server-Sent Events (one push per tick)"""
+    q = Queue(maxsize=4)
+    with _sse_lock:
+        _sse_clients.append(q)
+
+    def event_stream():
         try:
-            return jsonify(latest_output.to_dict())
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            # Send the latest snapshot immediately so new clients don't
+            # wait up to a second for the first tick
+            payload = latest_payload
+            if payload is not None:
+                yield b'data: ' + payload + b'\n\n'
+            while True:
+                yield b'data: ' + q.get() + b'\n\n'
+        finally:
+            with _sse_lock:
+                _sse_clients.remove(q)
+
+    return Response(
+        event_stream(), mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-store'}
+    )
 
 
 @app.route('/api/vessel')
 def get_vessel_info():
     """Get current vessel information"""
-    return jsonify(simulator.get_vessel_info())
+    global _vessel_cache
+    version, payload, etag = _vessel_cache
+    current = simulator.update_count
+    if version != current:
+        payload = orjson.dumps(
+            simulator.get_vessel_info(),
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+        )
+        etag = f'"vessel-{current}"'
+        _vessel_cache = (current, payload, etag)
+
+    # Short-circuit repeat polls with 304 Not Modified
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+
+    return Response(
+        payload, mimetype='application/json',
+        # Vessel info changes slowly; let clients reuse it briefly
+        headers={'ETag': etag, 'Cache-Control': 'public, max-age=5'}
+    )
 
 
 @app.route('/api/metrics')
@@ -130,6 +256,8 @@ if __name__ == '__main__':
     print("  POST /api/reset     - Reset system")
     print("\nScenarios: normal, collision, spoofing, anomaly")
     print("\nStarting server on http://localhost:5000")
+    print("For production use: gunicorn -w 1 -k gthread --threads 8 wsgi:app")
     print("="*60 + "\n")
     
+    start_background_processing()
     app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
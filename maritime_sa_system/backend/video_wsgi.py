@@ -0,0 +1,15 @@
+"""
+WSGI entry point for the video analysis server
+
+Run with a production server instead of the Werkzeug dev server, e.g.:
+
+    gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5000 video_wsgi:app
+
+Keep a single worker: the video processor, SA layer and processing
+state live in-process, so multiple workers would each see their own
+copy. Threads handle concurrent API traffic (status polls, SSE
+subscribers, frame fetches) while the processing pipeline runs in its
+own threads started by /api/start_processing.
+"""
+
+from video_server import app
@@ -0,0 +1,16 @@
+"""
+WSGI entry point for the demo server
+
+Run with a production server instead of the Werkzeug dev server, e.g.:
+
+    gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app
+
+Keep a single worker: the simulator and SA layer live in-process, so
+multiple workers would each run their own divergent simulation. Threads
+handle concurrent API traffic while the producer thread serializes the
+payload once per tick.
+"""
+
+from demo_server import app, start_background_processing
+
+start_background_processing()